@@ -2,20 +2,22 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_wtf.csrf import CSRFProtect
+from app.activity import ActivityLogger
 from config import Config
 
 # Initialize extensions
 db = SQLAlchemy()
 login_manager = LoginManager()
 csrf = CSRFProtect()
+activity_log = ActivityLogger()
 login_manager.login_view = 'auth.login'
 login_manager.login_message = 'Please log in to access this page.'
 
 
 @login_manager.user_loader
 def load_user(user_id):
-    from app.models import User
-    return User.query.get(int(user_id))
+    from app.auth.identity import load_identity
+    return load_identity(int(user_id))
 
 
 def create_app(config_class=Config):
@@ -26,6 +28,23 @@ def create_app(config_class=Config):
     db.init_app(app)
     login_manager.init_app(app)
     csrf.init_app(app)
+    activity_log.init_app(app)
+
+    # Bounded cache of the identities the user loader returns
+    from app.auth.identity import init_identity_cache
+    init_identity_cache(app)
+
+    # {% cache %} tag for expensive template fragments
+    from app.fragment_cache import init_fragment_cache
+    init_fragment_cache(app)
+
+    # Fingerprinted, precompressed static files (see `flask build-assets`)
+    from app.assets import init_assets
+    init_assets(app)
+
+    # gzip/brotli compression of HTML and JSON responses
+    from app.compression import init_compression
+    init_compression(app)
 
     # Register blueprints
     from app.auth.routes import auth
@@ -38,8 +57,20 @@ def create_app(config_class=Config):
     app.register_blueprint(quiz, url_prefix='/quiz')
     app.register_blueprint(admin, url_prefix='/admin')
 
-    # Create database tables
+    # Per-request query counts, N+1 warnings and Server-Timing headers
+    from app.instrumentation import init_instrumentation
+    init_instrumentation(app)
+
+    # Register CLI commands
+    from app.commands import register_commands
+    register_commands(app)
+
+    # Create database tables, any indexes missing from existing tables and the search index
     with app.app_context():
         db.create_all()
+        from app.schema import ensure_indexes
+        from app.search import ensure_search_index
+        ensure_indexes()
+        ensure_search_index()
 
     return app
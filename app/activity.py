@@ -0,0 +1,125 @@
+"""
+Activity Logging for Placement Preparation Portal
+==================================================
+StudentActivity rows are written behind the request: log() only appends the
+event to an in-memory queue, and a background thread flushes queued events in
+batched inserts once ACTIVITY_BATCH_SIZE events are pending or every
+ACTIVITY_FLUSH_INTERVAL seconds. Pending events are flushed on shutdown.
+With ACTIVITY_LOG_SYNC (or app.testing) events are written immediately.
+"""
+
+import atexit
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from sqlalchemy import insert
+
+
+class ActivityLogger:
+    """Write-behind logger for StudentActivity events."""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.sync = False
+        self.batch_size = 500
+        self.flush_interval = 2.0
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.sync = app.config.get('ACTIVITY_LOG_SYNC', False) or app.testing
+        self.batch_size = app.config.get('ACTIVITY_BATCH_SIZE', 500)
+        self.flush_interval = app.config.get('ACTIVITY_FLUSH_INTERVAL', 2.0)
+        app.extensions['activity_log'] = self
+        atexit.register(self.shutdown)
+
+    def log(self, user_id, activity_type, description=None):
+        """Record an activity. Returns immediately unless running in sync mode."""
+        event = {
+            'user_id': user_id,
+            'activity_type': activity_type,
+            'description': description,
+            'timestamp': datetime.utcnow(),
+        }
+        if self.sync:
+            self._write([event])
+            return
+
+        self._queue.append(event)
+        self._ensure_worker()
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write every queued event now, in batches. Returns the number written."""
+        written = 0
+        with self._lock:
+            while self._queue:
+                batch = []
+                while self._queue and len(batch) < self.batch_size:
+                    batch.append(self._queue.popleft())
+                self._write(batch)
+                written += len(batch)
+        return written
+
+    def discard(self, user_id):
+        """Drop a user's queued events, e.g. before the user is deleted. Returns the number dropped."""
+        with self._lock:
+            kept = [event for event in self._queue if event['user_id'] != user_id]
+            dropped = len(self._queue) - len(kept)
+            self._queue.clear()
+            self._queue.extend(kept)
+        return dropped
+
+    def shutdown(self):
+        """Stop the background worker and flush any remaining events."""
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=self.flush_interval + 5)
+        if self.app is not None:
+            self.flush()
+
+    def pending(self):
+        """Return the number of queued, unwritten events."""
+        return len(self._queue)
+
+    def _ensure_worker(self):
+        # Threads do not survive a fork, so restart the worker in child processes
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._stopping = False
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='activity-log-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                self.app.logger.exception('Failed to flush activity log batch')
+
+    def _write(self, events):
+        """Insert a batch of events with a single executemany in its own transaction."""
+        from app import db
+        from app.models import StudentActivity
+
+        if not events:
+            return
+        with self.app.app_context():
+            with db.engine.begin() as connection:
+                connection.execute(insert(StudentActivity.__table__), events)
@@ -1,17 +1,32 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, current_app
 from flask_login import login_required, current_user
 from app.models import User, Category, Question, Resource, QuizResult
-from app import db
+from app.quiz.question_bank import question_bank
+from app.counters import get_counts, invalidate_counts
+from app.response_cache import bump_content_version
+from app.fragment_cache import invalidate_fragments
+from app.cache import cache_stats as get_cache_stats
+from app.auth.identity import fresh_identity, invalidate_identity
+from app.leaderboard import leaderboards
+from app.analytics import get_analytics
+from app.item_stats import update_item_stats
+from app.search import search_questions
+from app.near_duplicates import near_duplicates
+from app.pagination import keyset_paginate, get_page_size
+from app.importer import import_file, detect_format
+from app import db, activity_log
+from sqlalchemy.orm import joinedload
 from functools import wraps
 
 admin = Blueprint('admin', __name__)
 
 
 def admin_required(f):
-    """Decorator to require admin access."""
+    """Decorator to require admin access, checked against the database rather than the identity cache."""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if not current_user.is_authenticated or current_user.role != 'admin':
+        identity = fresh_identity(current_user.id) if current_user.is_authenticated else None
+        if identity is None or not identity.is_active or identity.role != 'admin':
             flash('Admin access required.', 'danger')
             return redirect(url_for('main.home'))
         return f(*args, **kwargs)
@@ -24,25 +39,48 @@ def admin_required(f):
 @admin_required
 def dashboard():
     """Admin dashboard."""
-    users_count = User.query.count()
-    categories_count = Category.query.count()
-    questions_count = Question.query.count()
-    resources_count = Resource.query.count()
-    quiz_results_count = QuizResult.query.count()
+    counts = get_counts('users', 'categories', 'questions', 'resources', 'quiz_results')
 
     recent_users = User.query.order_by(User.created_at.desc()).limit(5).all()
-    recent_results = QuizResult.query.order_by(QuizResult.taken_at.desc()).limit(5).all()
+    recent_results = (QuizResult.query.options(joinedload(QuizResult.user))
+                      .order_by(QuizResult.taken_at.desc()).limit(5).all())
 
     return render_template('admin/dashboard.html',
-                           users_count=users_count,
-                           categories_count=categories_count,
-                           questions_count=questions_count,
-                           resources_count=resources_count,
-                           quiz_results_count=quiz_results_count,
+                           users_count=counts['users'],
+                           categories_count=counts['categories'],
+                           questions_count=counts['questions'],
+                           resources_count=counts['resources'],
+                           quiz_results_count=counts['quiz_results'],
                            recent_users=recent_users,
                            recent_results=recent_results)
 
 
+@admin.route('/cache-stats')
+@login_required
+@admin_required
+def cache_stats():
+    """Report hit/miss statistics of the in-process caches as JSON."""
+    return jsonify(get_cache_stats())
+
+
+@admin.route('/analytics', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def analytics():
+    """Score distributions, percentiles, pass rates and attempt trends per category."""
+    if request.method == 'POST':
+        get_analytics(refresh=True)
+        flash('Analytics refreshed.', 'success')
+        return redirect(url_for('admin.analytics'))
+
+    summary = get_analytics()
+
+    if request.args.get('format') == 'json':
+        return jsonify(dict(summary, computed_at=summary['computed_at'].isoformat()))
+
+    return render_template('admin/analytics.html', summary=summary)
+
+
 # ============ User Management ============
 @admin.route('/students')
 @admin.route('/users')
@@ -67,6 +105,7 @@ def toggle_role(user_id):
 
     user.role = 'admin' if user.role == 'student' else 'student'
     db.session.commit()
+    invalidate_identity(user.id)
 
     flash(f'Role updated to {user.role} for {user.name}.', 'success')
     return redirect(url_for('admin.list_users'))
@@ -83,8 +122,13 @@ def delete_user(user_id):
         flash('Cannot delete your own account.', 'warning')
         return redirect(url_for('admin.list_users'))
 
+    # A queued write-behind event must not be inserted after its user is gone
+    activity_log.discard(user.id)
     db.session.delete(user)
     db.session.commit()
+    invalidate_identity(user_id)
+    invalidate_counts('users', 'quiz_results')
+    leaderboards.clear()
 
     flash(f'User {user.name} has been deleted.', 'success')
     return redirect(url_for('admin.list_users'))
@@ -113,6 +157,8 @@ def create_category():
         category = Category(name=name, type=type_, description=description)
         db.session.add(category)
         db.session.commit()
+        invalidate_counts('categories')
+        invalidate_fragments('categories')
 
         flash('Category created successfully!', 'success')
         return redirect(url_for('admin.list_categories'))
@@ -133,6 +179,7 @@ def edit_category(category_id):
         category.description = request.form.get('description')
 
         db.session.commit()
+        invalidate_fragments('categories', 'questions')
 
         flash('Category updated successfully!', 'success')
         return redirect(url_for('admin.list_categories'))
@@ -147,8 +194,17 @@ def delete_category(category_id):
     """Delete a category."""
     category = Category.query.get_or_404(category_id)
 
+    leaderboards.remove_category(category.id)
+    # Load the questions with their stats up front (and keep them referenced, the session holds
+    # them weakly) so the delete cascade does not fetch each question's stats on its own
+    questions = Question.query.options(joinedload(Question.stats)).filter_by(category_id=category.id).all()
     db.session.delete(category)
     db.session.commit()
+    leaderboards.clear()
+    near_duplicates.invalidate()
+    question_bank.invalidate(category_id)
+    invalidate_counts('categories', 'questions')
+    invalidate_fragments('categories', 'questions')
 
     flash('Category deleted successfully!', 'success')
     return redirect(url_for('admin.list_categories'))
@@ -159,15 +215,39 @@ def delete_category(category_id):
 @login_required
 @admin_required
 def list_questions():
-    """List all questions."""
+    """List questions newest first, or search them (?q=) best match first, one page at a time."""
     category_id = request.args.get('category_id', type=int)
-    if category_id:
-        questions = Question.query.filter_by(category_id=category_id).all()
+    difficulty = request.args.get('difficulty') or None
+    search = (request.args.get('q') or '').strip()
+    per_page = get_page_size('ADMIN_QUESTIONS_PER_PAGE')
+
+    if search:
+        page = search_questions(search, category_id=category_id, difficulty=difficulty,
+                                cursor=request.args.get('after'), per_page=per_page)
     else:
-        questions = Question.query.order_by(Question.created_at.desc()).all()
+        query = Question.query.options(joinedload(Question.category), joinedload(Question.stats))
+        if category_id:
+            query = query.filter(Question.category_id == category_id)
+        if difficulty:
+            query = query.filter(Question.difficulty == difficulty)
+
+        page = keyset_paginate(query, (Question.created_at, Question.id),
+                               cursor=request.args.get('after'), per_page=per_page)
 
     categories = Category.query.order_by(Category.type, Category.name).all()
-    return render_template('admin/questions.html', questions=questions, categories=categories)
+    return render_template('admin/questions.html', questions=page.items, page=page,
+                           categories=categories, category_id=category_id, difficulty=difficulty,
+                           search=search, min_attempts=current_app.config.get('ITEM_STATS_MIN_ATTEMPTS', 20))
+
+
+@admin.route('/questions/stats', methods=['POST'])
+@login_required
+@admin_required
+def update_question_stats():
+    """Fold answers submitted since the last run into the per-question statistics."""
+    answers, questions = update_item_stats()
+    flash(f'Processed {answers} new answers; updated statistics for {questions} questions.', 'success')
+    return redirect(url_for('admin.list_questions'))
 
 
 @admin.route('/questions/add', methods=['GET', 'POST'])
@@ -179,7 +259,7 @@ def create_question():
     categories = Category.query.order_by(Category.type, Category.name).all()
 
     if request.method == 'POST':
-        category_id = request.form.get('category_id')
+        category_id = request.form.get('category_id', type=int)
         question_text = request.form.get('question_text')
         option_a = request.form.get('option_a')
         option_b = request.form.get('option_b')
@@ -200,8 +280,23 @@ def create_question():
             explanation=explanation,
             difficulty=difficulty
         )
+
+        # Ask for confirmation before adding a near-duplicate of an existing question
+        similar = near_duplicates.find(question_text)
+        if similar and not request.form.get('confirm_duplicate'):
+            similar_questions = {q.id: q for q in Question.query.options(joinedload(Question.category))
+                                 .filter(Question.id.in_([question_id for question_id, _ in similar]))}
+            matches = [(similar_questions[question_id], score) for question_id, score in similar
+                       if question_id in similar_questions]
+            flash('This question looks very similar to existing questions. Review them below.', 'warning')
+            return render_template('admin/question_form.html', question=None, draft=question,
+                                   categories=categories, similar=matches)
+
         db.session.add(question)
         db.session.commit()
+        near_duplicates.add(question.id, question.question_text)
+        question_bank.invalidate(category_id)
+        invalidate_counts('questions')
 
         flash('Question added successfully!', 'success')
         return redirect(url_for('admin.list_questions'))
@@ -209,6 +304,46 @@ def create_question():
     return render_template('admin/question_form.html', question=None, categories=categories)
 
 
+@admin.route('/questions/import', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def import_questions():
+    """Bulk import questions from an uploaded CSV or JSON Lines file."""
+    report = None
+
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            flash('Please choose a CSV or JSONL file to import.', 'warning')
+            return redirect(url_for('admin.import_questions'))
+
+        fmt = request.form.get('format') or detect_format(upload.filename)
+        report = import_file(upload.stream, fmt)
+        flash(f'Import finished: {report.summary()}.', 'success' if not report.error_count else 'warning')
+
+    return render_template('admin/import_questions.html', report=report)
+
+
+@admin.route('/questions/duplicates')
+@login_required
+@admin_required
+def duplicate_questions():
+    """Report clusters of near-duplicate questions."""
+    clusters = near_duplicates.clusters()
+    question_ids = [question_id for cluster in clusters for question_id in cluster]
+
+    questions = {}
+    for start in range(0, len(question_ids), 500):
+        chunk = question_ids[start:start + 500]
+        questions.update((q.id, q) for q in Question.query.options(joinedload(Question.category))
+                         .filter(Question.id.in_(chunk)))
+
+    clusters = [[questions[question_id] for question_id in cluster if question_id in questions]
+                for cluster in clusters]
+    return render_template('admin/duplicate_questions.html',
+                           clusters=[cluster for cluster in clusters if len(cluster) > 1])
+
+
 @admin.route('/questions/edit/<int:question_id>', methods=['GET', 'POST'])
 @admin.route('/questions/<int:question_id>/edit', methods=['GET', 'POST'])
 @login_required
@@ -219,7 +354,8 @@ def edit_question(question_id):
     categories = Category.query.order_by(Category.type, Category.name).all()
 
     if request.method == 'POST':
-        question.category_id = request.form.get('category_id')
+        old_category_id = question.category_id
+        question.category_id = request.form.get('category_id', type=int)
         question.question_text = request.form.get('question_text')
         question.option_a = request.form.get('option_a')
         question.option_b = request.form.get('option_b')
@@ -228,8 +364,12 @@ def edit_question(question_id):
         question.correct_answer = request.form.get('correct_answer')
         question.explanation = request.form.get('explanation')
         question.difficulty = request.form.get('difficulty')
+        new_category_id = question.category_id
 
         db.session.commit()
+        near_duplicates.add(question.id, question.question_text)
+        question_bank.invalidate(old_category_id, new_category_id)
+        invalidate_fragments('questions')
 
         flash('Question updated successfully!', 'success')
         return redirect(url_for('admin.list_questions'))
@@ -244,9 +384,13 @@ def edit_question(question_id):
 def delete_question(question_id):
     """Delete a question."""
     question = Question.query.get_or_404(question_id)
+    category_id = question.category_id
 
     db.session.delete(question)
     db.session.commit()
+    near_duplicates.remove(question_id)
+    question_bank.invalidate(category_id)
+    invalidate_counts('questions')
 
     flash('Question deleted successfully!', 'success')
     return redirect(url_for('admin.list_questions'))
@@ -285,6 +429,8 @@ def create_resource():
         )
         db.session.add(resource)
         db.session.commit()
+        invalidate_counts('resources')
+        bump_content_version()
 
         flash('Resource created successfully!', 'success')
         return redirect(url_for('admin.list_resources'))
@@ -307,6 +453,7 @@ def edit_resource(resource_id):
         resource.link = request.form.get('link')
 
         db.session.commit()
+        bump_content_version()
 
         flash('Resource updated successfully!', 'success')
         return redirect(url_for('admin.list_resources'))
@@ -324,6 +471,8 @@ def delete_resource(resource_id):
 
     db.session.delete(resource)
     db.session.commit()
+    invalidate_counts('resources')
+    bump_content_version()
 
     flash('Resource deleted successfully!', 'success')
     return redirect(url_for('admin.list_resources'))
@@ -0,0 +1,173 @@
+"""
+Admin Analytics for Placement Preparation Portal
+=================================================
+Score distributions, percentiles, pass rates and attempt trends for every
+quiz category. The (category_id, percentage, taken_at) columns of all quiz
+results are streamed into NumPy arrays once and every category is summarised
+in the same vectorised pass, grouped by category index, instead of issuing
+one query per category.
+
+The summary is cached and carries the time it was computed, so the admin
+page can show how fresh it is and offer a refresh.
+"""
+
+from datetime import datetime
+import numpy as np
+from flask import current_app
+from sqlalchemy import select
+from app import db
+from app.cache import TTLCache, register_cache
+from app.models import Category, QuizResult
+
+analytics_cache = register_cache(TTLCache('analytics'))
+
+
+def load_results(batch_size=10000):
+    """
+    Stream every quiz result into three arrays:
+    category_ids (int64), percentages (float64) and taken_at (datetime64[s]).
+    Missing percentages count as 0, like in the stats rollups.
+    """
+    statement = select(QuizResult.category_id, QuizResult.percentage, QuizResult.taken_at)\
+        .execution_options(yield_per=batch_size)
+
+    category_chunks, percentage_chunks, taken_at_chunks = [], [], []
+    for partition in db.session.execute(statement).partitions():
+        category_ids, percentages, taken_at = zip(*partition)
+        category_chunks.append(np.array(category_ids, dtype=np.int64))
+        percentage_chunks.append(np.array(percentages, dtype=np.float64))
+        taken_at_chunks.append(np.array(taken_at, dtype='datetime64[s]'))
+
+    if not category_chunks:
+        return (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64),
+                np.empty(0, dtype='datetime64[s]'))
+
+    percentages = np.nan_to_num(np.concatenate(percentage_chunks), nan=0.0)
+    return np.concatenate(category_chunks), percentages, np.concatenate(taken_at_chunks)
+
+
+def _quantiles(groups, values, counts, quantiles):
+    """Linear-interpolated quantiles of values within each group, for all groups at once."""
+    result = np.full((len(quantiles), len(counts)), np.nan)
+    if not len(values):
+        return result
+
+    # Sort by group, then by value, so each group is a contiguous sorted run
+    ordered = values[np.lexsort((values, groups))]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = counts > 0
+
+    for row, q in enumerate(quantiles):
+        position = starts + q * np.maximum(counts - 1, 0)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        fraction = position - lower
+        lower = np.minimum(lower, len(ordered) - 1)
+        upper = np.minimum(upper, len(ordered) - 1)
+        interpolated = ordered[lower] * (1 - fraction) + ordered[upper] * fraction
+        result[row] = np.where(present, interpolated, np.nan)
+    return result
+
+
+def summarize(groups, group_count, percentages, taken_at, bins=10, pass_mark=50.0,
+              trend_days=30, today=None):
+    """
+    Summarise results grouped by an integer group index in [0, group_count).
+    Returns a dict of arrays with one row per group.
+    """
+    today = np.datetime64(today or datetime.utcnow().date(), 'D')
+
+    attempts = np.bincount(groups, minlength=group_count)
+    totals = np.bincount(groups, weights=percentages, minlength=group_count)
+    passes = np.bincount(groups, weights=percentages >= pass_mark, minlength=group_count)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(attempts > 0, totals / attempts, np.nan)
+        pass_rate = np.where(attempts > 0, passes / attempts * 100, np.nan)
+
+    # Histogram: one flat bincount over (group, bin) pairs
+    bin_index = np.clip((percentages / (100.0 / bins)).astype(np.int64), 0, bins - 1)
+    histogram = np.bincount(groups * bins + bin_index, minlength=group_count * bins)\
+        .reshape(group_count, bins)
+
+    # Daily attempt counts over the trailing window, oldest day first
+    age = (today - taken_at.astype('datetime64[D]')).astype(np.int64)
+    recent = ~np.isnat(taken_at) & (age >= 0) & (age < trend_days)
+    trend = np.bincount(groups[recent] * trend_days + (trend_days - 1 - age[recent]),
+                        minlength=group_count * trend_days).reshape(group_count, trend_days)
+
+    p50, p90 = _quantiles(groups, percentages, attempts, (0.5, 0.9))
+
+    return {
+        'attempts': attempts,
+        'mean': mean,
+        'p50': p50,
+        'p90': p90,
+        'pass_rate': pass_rate,
+        'histogram': histogram,
+        'trend': trend,
+    }
+
+
+def _row(summary, index):
+    """Convert one group of a summary to plain Python values (NaN becomes None)."""
+    def number(value):
+        return None if np.isnan(value) else round(float(value), 2)
+
+    return {
+        'attempts': int(summary['attempts'][index]),
+        'mean': number(summary['mean'][index]),
+        'p50': number(summary['p50'][index]),
+        'p90': number(summary['p90'][index]),
+        'pass_rate': number(summary['pass_rate'][index]),
+        'histogram': summary['histogram'][index].tolist(),
+        'trend': summary['trend'][index].tolist(),
+    }
+
+
+def build_analytics():
+    """Compute the analytics summary for every category plus an overall row."""
+    config = current_app.config
+    bins = config.get('ANALYTICS_HISTOGRAM_BINS', 10)
+    pass_mark = config.get('ANALYTICS_PASS_MARK', 50.0)
+    trend_days = config.get('ANALYTICS_TREND_DAYS', 30)
+    options = {'bins': bins, 'pass_mark': pass_mark, 'trend_days': trend_days,
+               'today': datetime.utcnow().date()}
+
+    categories = db.session.query(Category.id, Category.name, Category.type)\
+        .order_by(Category.type, Category.name).all()
+    category_ids, percentages, taken_at = load_results()
+
+    # Map category IDs to dense group indexes; results of deleted categories
+    # only count towards the overall row
+    known = np.array(sorted(category_id for category_id, _, _ in categories), dtype=np.int64)
+    position = np.searchsorted(known, category_ids)
+    matched = position < len(known)
+    matched[matched] = known[position[matched]] == category_ids[matched]
+
+    by_category = summarize(position[matched], len(known), percentages[matched],
+                            taken_at[matched], **options)
+    overall = summarize(np.zeros(len(percentages), dtype=np.int64), 1,
+                        percentages, taken_at, **options)
+
+    index_of = {int(category_id): index for index, category_id in enumerate(known)}
+    rows = [dict(_row(by_category, index_of[category_id]), id=category_id, name=name, type=category_type)
+            for category_id, name, category_type in categories]
+
+    width = 100.0 / bins
+    return {
+        'computed_at': datetime.utcnow(),
+        'pass_mark': pass_mark,
+        'trend_days': trend_days,
+        'bins': [(round(i * width, 1), round((i + 1) * width, 1)) for i in range(bins)],
+        'overall': _row(overall, 0),
+        'categories': rows,
+    }
+
+
+def get_analytics(refresh=False):
+    """Return the cached analytics summary, recomputing it if stale or refresh is set."""
+    if refresh:
+        analytics_cache.invalidate('summary')
+    ttl = current_app.config.get('ANALYTICS_CACHE_TTL', 600)
+    return analytics_cache.get('summary', build_analytics, ttl=ttl)
@@ -0,0 +1,148 @@
+"""
+Static Asset Pipeline for Placement Preparation Portal
+=======================================================
+`flask build-assets` copies every file under static/ to static/build/ with
+a content hash in its name (css/style.css -> build/css/style.1a2b3c4d5e6f.css),
+writes gzip and, if the optional brotli package is installed, brotli
+variants next to it, and records everything in static/build/manifest.json.
+
+When the manifest exists, url_for('static', filename='css/style.css') emits
+the hashed name. Hashed files never change, so they are served with
+far-future immutable cache headers, choosing the precompressed variant the
+client accepts. Without a manifest static files are served as before. The
+manifest is read at start-up; restart the app after rebuilding.
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+from flask import current_app, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip variants are written
+    brotli = None
+
+BUILD_DIR = 'build'
+MANIFEST = 'manifest.json'
+
+# Only text formats are worth compressing; tiny files are sent as they are
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.map')
+MIN_COMPRESS_SIZE = 512
+
+# Encoding -> file suffix, in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _fingerprint(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def _write_variants(path, data):
+    """Write the compressed variants of a file that are smaller than it; return their encodings."""
+    variants = {'gzip': lambda: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = lambda: brotli.compress(data, quality=11)
+
+    written = []
+    for encoding, suffix in ENCODINGS:
+        if encoding not in variants:
+            continue
+        compressed = variants[encoding]()
+        if len(compressed) < len(data):
+            with open(path + suffix, 'wb') as f:
+                f.write(compressed)
+            written.append(encoding)
+    return written
+
+
+def build_assets(static_folder, clean=False):
+    """
+    Fingerprint and precompress every static file; returns the manifest
+    {logical_name: {'path': hashed_name, 'encodings': [...], 'size': bytes}}.
+    """
+    build_root = os.path.join(static_folder, BUILD_DIR)
+    if clean and os.path.isdir(build_root):
+        shutil.rmtree(build_root)
+
+    manifest = {}
+    for directory, subdirs, files in os.walk(static_folder):
+        if os.path.abspath(directory) == os.path.abspath(static_folder):
+            subdirs[:] = [d for d in subdirs if d != BUILD_DIR]
+        for filename in sorted(files):
+            source = os.path.join(directory, filename)
+            name = os.path.relpath(source, static_folder).replace(os.sep, '/')
+            with open(source, 'rb') as f:
+                data = f.read()
+
+            stem, ext = os.path.splitext(name)
+            hashed = f'{BUILD_DIR}/{stem}.{_fingerprint(data)}{ext}'
+            target = os.path.join(static_folder, *hashed.split('/'))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as f:
+                f.write(data)
+
+            encodings = []
+            if ext.lower() in COMPRESSIBLE and len(data) >= MIN_COMPRESS_SIZE:
+                encodings = _write_variants(target, data)
+            manifest[name] = {'path': hashed, 'encodings': encodings, 'size': len(data)}
+
+    with open(os.path.join(build_root, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_folder):
+    """Return the build manifest, or {} if assets have not been built."""
+    try:
+        with open(os.path.join(static_folder, BUILD_DIR, MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _hashed_url_defaults(endpoint, values):
+    """url_defaults hook: point url_for('static', ...) at the fingerprinted file."""
+    if endpoint != 'static' or 'filename' not in values:
+        return
+    entry = current_app.extensions['assets'].get(values['filename'])
+    if entry is not None:
+        values['filename'] = entry['path']
+
+
+def serve_static(filename):
+    """Static view: hashed files get immutable caching and a precompressed variant if accepted."""
+    app = current_app
+    entry = app.extensions['assets_by_path'].get(filename)
+    if entry is None:
+        return app.send_static_file(filename)
+
+    path, mimetype, encoding = filename, None, None
+    for candidate, suffix in ENCODINGS:
+        if candidate in entry['encodings'] and request.accept_encodings[candidate]:
+            # Keep the original type; the suffix would make it application/gzip
+            path, encoding = filename + suffix, candidate
+            mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            break
+
+    response = send_from_directory(app.static_folder, path, mimetype=mimetype,
+                                   download_name=os.path.basename(filename),
+                                   max_age=app.config.get('ASSETS_MAX_AGE', 31536000))
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def init_assets(app):
+    """Load the asset manifest and install the hashed-URL and static-serving hooks."""
+    manifest = load_manifest(app.static_folder) if app.config.get('ASSETS_FINGERPRINT', True) else {}
+    app.extensions['assets'] = manifest
+    app.extensions['assets_by_path'] = {entry['path']: entry for entry in manifest.values()}
+    app.url_defaults(_hashed_url_defaults)
+    app.view_functions['static'] = serve_static
@@ -0,0 +1,117 @@
+"""
+Cached Identity Loader for Placement Preparation Portal
+========================================================
+Flask-Login calls the user loader on every authenticated request. Instead of
+loading the full User row each time, the loader returns a CachedIdentity
+built from a bounded LRU/TTL cache holding only the fields requests need.
+The full row is loaded lazily, and only if a view touches another attribute.
+
+Cached identities are keyed by a per-user version stamp kept in the
+watermarks table. invalidate_identity() bumps a user's stamp after a role
+change or deletion, so every process drops that user's cached identity within
+IDENTITY_VERSION_TTL seconds; other users' identities stay cached. Admin
+routes do not wait for that: they check role and is_active against the
+database on every request (fresh_identity).
+"""
+
+from datetime import datetime
+from flask import current_app
+from flask_login import UserMixin
+from sqlalchemy import update
+from app import db
+from app.cache import TTLCache, register_cache
+from app.models import User, Watermark
+
+IDENTITY_VERSION = 'identity:{}'
+
+identity_cache = register_cache(TTLCache('identities', maxsize=10000))
+version_cache = register_cache(TTLCache('identity_version'))
+
+
+class CachedIdentity(UserMixin):
+    """
+    Lightweight stand-in for User exposing id, name, role and is_active.
+    Any other attribute is read from the full User row, loaded on first use.
+    """
+
+    def __init__(self, id, name, role, active):
+        self.id = id
+        self.name = name
+        self.role = role
+        self._active = active
+        self._user = None
+
+    @property
+    def is_active(self):
+        return bool(self._active)
+
+    @property
+    def user(self):
+        """Return the full User row, loading it on first access."""
+        if self._user is None:
+            self._user = db.session.get(User, self.id)
+        return self._user
+
+    def __getattr__(self, name):
+        # Only called for attributes not defined above, e.g. email or college
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.user, name)
+
+    def __repr__(self):
+        return f'<CachedIdentity {self.id} ({self.role})>'
+
+
+def _load_fields(user_id):
+    """Fetch the cached identity fields for a user with a single narrow query."""
+    return db.session.query(User.id, User.name, User.role, User.is_active)\
+        .filter(User.id == user_id).first()
+
+
+def _load_version(user_id):
+    watermark = db.session.get(Watermark, IDENTITY_VERSION.format(user_id))
+    return watermark.position if watermark is not None else 0
+
+
+def identity_version(user_id):
+    """Return a user's identity version; their cached identities from older versions are stale."""
+    ttl = current_app.config.get('IDENTITY_VERSION_TTL', 5)
+    return version_cache.get(user_id, lambda: _load_version(user_id), ttl=ttl)
+
+
+def init_identity_cache(app):
+    """Size the identity and per-user version caches from the app config."""
+    identity_cache.maxsize = app.config.get('IDENTITY_CACHE_SIZE', 10000)
+    version_cache.maxsize = app.config.get('IDENTITY_CACHE_SIZE', 10000)
+
+
+def load_identity(user_id):
+    """Return a CachedIdentity for user_id, or None if the user does not exist."""
+    ttl = current_app.config.get('IDENTITY_CACHE_TTL', 300)
+    key = (user_id, identity_version(user_id))
+    fields = identity_cache.get(key, lambda: _load_fields(user_id), ttl=ttl)
+    if fields is None:
+        return None
+    return CachedIdentity(*fields)
+
+
+def fresh_identity(user_id):
+    """Return a CachedIdentity read from the database now, bypassing the cache."""
+    fields = _load_fields(user_id)
+    return CachedIdentity(*fields) if fields is not None else None
+
+
+def invalidate_identity(user_id):
+    """
+    Call after a user's role or account changes. The user's version is bumped,
+    so every process reloads this user's identity.
+    """
+    name = IDENTITY_VERSION.format(user_id)
+    bumped = db.session.execute(
+        update(Watermark).where(Watermark.name == name)
+        .values(position=Watermark.position + 1, updated_at=datetime.utcnow())).rowcount
+    if not bumped:
+        db.session.add(Watermark(name=name, position=1, updated_at=datetime.utcnow()))
+    db.session.commit()
+    # Entries under the old version are no longer looked up and age out of the LRU
+    version_cache.invalidate(user_id)
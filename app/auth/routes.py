@@ -2,7 +2,8 @@ from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_user, logout_user, login_required, current_user
 from app.auth.forms import LoginForm, RegistrationForm
 from app.models import User
-from app import db
+from app.counters import invalidate_counts
+from app import db, activity_log
 
 auth = Blueprint('auth', __name__)
 
@@ -22,6 +23,7 @@ def login():
 
         if user and user.check_password(password):
             login_user(user)
+            activity_log.log(user.id, 'login', 'Logged in')
             flash('Login successful!', 'success')
 
             # Redirect to next page if exists, otherwise dashboard
@@ -52,6 +54,7 @@ def register():
 
         db.session.add(user)
         db.session.commit()
+        invalidate_counts('users')
 
         flash('Registration successful! Please log in.', 'success')
         return redirect(url_for('auth.login'))
@@ -0,0 +1,86 @@
+"""
+In-Process Caches for Placement Preparation Portal
+===================================================
+Small, thread-safe caches shared by the blueprints. Every cache registers
+itself by name so its hit/miss statistics can be inspected from the admin
+panel (see admin.cache_stats).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+_registry = {}
+
+
+def register_cache(cache):
+    """Register a cache so its statistics are reported by cache_stats()."""
+    _registry[cache.name] = cache
+    return cache
+
+
+def cache_stats():
+    """Return {cache_name: stats_dict} for every registered cache."""
+    return {name: cache.stats() for name, cache in sorted(_registry.items())}
+
+
+class TTLCache:
+    """
+    Thread-safe key/value cache whose entries expire after a fixed TTL.
+    Values are computed on demand by a loader and can be invalidated explicitly.
+    If maxsize is given, the least recently used entries are evicted first.
+    """
+
+    def __init__(self, name, ttl=60, maxsize=None):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key, loader, ttl=None):
+        """Return the cached value for key, calling loader() on a miss or expiry."""
+        ttl = self.ttl if ttl is None else ttl
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > now:
+            self.hits += 1
+            if self.maxsize:
+                with self._lock:
+                    if key in self._entries:
+                        self._entries.move_to_end(key)
+            return entry[0]
+
+        self.misses += 1
+        value = loader()
+        with self._lock:
+            self._entries[key] = (value, now + ttl)
+            self._entries.move_to_end(key)
+            if self.maxsize:
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, *keys):
+        """Drop the given keys, or every entry if no keys are given."""
+        with self._lock:
+            if keys:
+                for key in keys:
+                    self._entries.pop(key, None)
+            else:
+                self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        """Return hit/miss counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,168 @@
+"""
+CLI Commands for Placement Preparation Portal
+==============================================
+Maintenance commands registered on the Flask CLI, e.g.:
+    flask --app run.py rebuild-stats
+"""
+
+import click
+from flask.cli import with_appcontext
+
+
+@click.command('rebuild-stats')
+@click.option('--batch-size', default=10000, show_default=True,
+              help='Rows streamed and inserted per batch.')
+@with_appcontext
+def rebuild_stats_command(batch_size):
+    """Recompute the per-user quiz statistics rollups."""
+    from app.stats import rebuild_user_stats
+
+    users, categories = rebuild_user_stats(batch_size=batch_size)
+    click.echo(f'Rebuilt stats for {users} users ({categories} user/category rows).')
+
+
+@click.command('rebuild-leaderboards')
+@click.option('--batch-size', default=10000, show_default=True,
+              help='Rows streamed and inserted per batch.')
+@with_appcontext
+def rebuild_leaderboards_command(batch_size):
+    """Recompute the per-category and overall leaderboards."""
+    from app.leaderboard import rebuild_leaderboards
+
+    entries = rebuild_leaderboards(batch_size=batch_size)
+    click.echo(f'Rebuilt leaderboards ({entries} entries).')
+
+
+@click.command('update-item-stats')
+@click.option('--rebuild', is_flag=True, help='Recompute from every answer instead of only new ones.')
+@click.option('--batch-size', default=5000, show_default=True, help='Answers streamed per batch.')
+@with_appcontext
+def update_item_stats_command(rebuild, batch_size):
+    """Update per-question attempt counts, correctness rates and discrimination."""
+    from app.item_stats import update_item_stats, rebuild_item_stats
+
+    job = rebuild_item_stats if rebuild else update_item_stats
+    answers, questions = job(batch_size=batch_size)
+    click.echo(f'Processed {answers} answers; updated statistics for {questions} questions.')
+
+
+@click.command('import-questions')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']),
+              help='File format (detected from the extension by default).')
+@click.option('--batch-size', default=5000, show_default=True, help='Rows inserted per batch.')
+@click.option('--no-similarity-check', is_flag=True, help='Do not flag near-duplicate questions.')
+@with_appcontext
+def import_questions_command(path, fmt, batch_size, no_similarity_check):
+    """Bulk import questions from a CSV or JSON Lines file."""
+    from app.importer import import_file, detect_format
+
+    with open(path, 'rb') as stream:
+        report = import_file(stream, fmt or detect_format(path), batch_size=batch_size,
+                             check_similar=not no_similarity_check)
+
+    for line, message in report.errors:
+        click.echo(f'line {line}: {message}', err=True)
+    for line, _, matches in report.near_duplicates:
+        similar = ', '.join(f'#{key}' if isinstance(key, int) else f'line {key[1]}' for key, _ in matches)
+        click.echo(f'line {line}: possible near-duplicate of {similar}', err=True)
+    if report.error_count > len(report.errors):
+        click.echo(f'... and {report.error_count - len(report.errors)} more errors', err=True)
+    click.echo(f'Imported {path}: {report.summary()}.')
+
+
+@click.command('reindex-search')
+@with_appcontext
+def reindex_search_command():
+    """Rebuild the full-text search indexes over questions and resources."""
+    from app.search import reindex
+
+    counts = reindex()
+    if not counts:
+        raise click.ClickException('Full-text search needs SQLite with FTS5; nothing to reindex.')
+    for name, rows in counts.items():
+        click.echo(f'Reindexed {name}: {rows} rows.')
+
+
+@click.command('generate-data')
+@click.option('--scale', default=1.0, show_default=True,
+              help='1 = 1k users, 100k quiz results, 500k activities.')
+@click.option('--seed', default=42, show_default=True, help='Random seed; same seed, same data.')
+@click.option('--answers', is_flag=True, help='Also write 10 answers per quiz result.')
+@click.option('--end-date', type=click.DateTime(formats=['%Y-%m-%d']),
+              help='Last day of generated history (default: today).')
+@click.option('--batch-size', default=200000, show_default=True, help='Rows per insert transaction.')
+@click.option('--password', default='password', show_default=True, help='Password of every generated user.')
+@click.option('--no-rebuild', is_flag=True, help='Skip rebuilding stats, leaderboards and item statistics.')
+@with_appcontext
+def generate_data_command(scale, seed, answers, end_date, batch_size, password, no_rebuild):
+    """Fill the database with deterministic synthetic data for load testing."""
+    from app.synthetic import Generator
+
+    generator = Generator(scale=scale, seed=seed, answers=answers,
+                          end_date=end_date.date() if end_date else None,
+                          batch_size=batch_size, password=password, echo=click.echo)
+    counts = generator.run(rebuild=not no_rebuild)
+    if answers:
+        click.echo(f'quiz_answers: {counts["quiz_answers"]} rows')
+    click.echo(f'Admin login: {generator.admin_email} / {password}')
+
+
+@click.command('build-assets')
+@click.option('--clean', is_flag=True, help='Delete previously built files first.')
+@with_appcontext
+def build_assets_command(clean):
+    """Fingerprint and precompress the static files."""
+    from flask import current_app
+    from app.assets import brotli, build_assets
+
+    manifest = build_assets(current_app.static_folder, clean=clean)
+    for name, entry in sorted(manifest.items()):
+        encodings = ', '.join(entry['encodings']) or 'uncompressed'
+        click.echo(f'{name} -> {entry["path"]} ({encodings})')
+    if brotli is None:
+        click.echo('Install the brotli package to also write .br variants.', err=True)
+    click.echo(f'Built {len(manifest)} assets.')
+
+
+@click.command('purge-attempts')
+@with_appcontext
+def purge_attempts_command():
+    """Delete expired quizzes in progress."""
+    from app.quiz.attempts import get_attempt_store
+
+    removed = get_attempt_store().purge_expired()
+    click.echo(f'Purged {removed} expired quiz attempts.')
+
+
+@click.command('check-query-plans')
+def check_query_plans_command():
+    """Fail if any route issues a query that falls back to a full table scan."""
+    from config import Config
+    from app.query_plans import check_query_plans
+
+    failures = check_query_plans(Config)
+    reported = set()
+    for label, statement, offending in failures:
+        if (label, statement) in reported:
+            continue
+        reported.add((label, statement))
+        click.echo(f'[{label}] {", ".join(offending)}')
+        click.echo(f'    {" ".join(statement.split())}')
+
+    if failures:
+        raise click.ClickException(f'{len(reported)} queries fall back to full table scans.')
+    click.echo('All checked queries use an index.')
+
+
+def register_commands(app):
+    """Register all CLI commands with the application."""
+    app.cli.add_command(rebuild_stats_command)
+    app.cli.add_command(rebuild_leaderboards_command)
+    app.cli.add_command(update_item_stats_command)
+    app.cli.add_command(import_questions_command)
+    app.cli.add_command(reindex_search_command)
+    app.cli.add_command(generate_data_command)
+    app.cli.add_command(build_assets_command)
+    app.cli.add_command(purge_attempts_command)
+    app.cli.add_command(check_query_plans_command)
@@ -0,0 +1,158 @@
+"""
+Response Compression for Placement Preparation Portal
+======================================================
+WSGI middleware that gzip- or brotli-compresses HTML, JSON and other text
+responses for clients that accept it. The body is compressed chunk by chunk
+as the application yields it, so streamed responses are never buffered
+whole.
+
+Responses are left alone when they are small (COMPRESSION_MIN_SIZE), not a
+text type, already encoded (e.g. the precompressed static files), partial
+(206), marked Cache-Control: no-transform, or answered to a HEAD request.
+Brotli is used only if the optional brotli package is installed.
+
+Every response that could be compressed carries Vary: Accept-Encoding and a
+weak ETag, whether or not this particular one was, and so does a 304 that
+revalidates such a response, so caches never mix up the variants.
+
+Measure the size/CPU trade-off of the levels with:
+    python -m benchmarks.compression
+"""
+
+import zlib
+from werkzeug.http import parse_accept_header
+from werkzeug.wsgi import ClosingIterator
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    'text/html', 'text/plain', 'text/css', 'text/csv', 'text/javascript', 'text/xml',
+    'application/json', 'application/javascript', 'application/xml', 'image/svg+xml',
+}
+
+# Preferred first when the client rates encodings equally
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(accept_encoding, encodings=ENCODINGS):
+    """Return the best encoding the Accept-Encoding header allows, or None."""
+    if not accept_encoding:
+        return None
+    accept = parse_accept_header(accept_encoding)
+    best, best_quality = None, 0
+    for encoding in encodings:
+        quality = accept[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compressor(encoding, level):
+    """Return (compress(chunk), finish()) callables for an encoding."""
+    if encoding == 'br':
+        engine = brotli.Compressor(quality=level)
+        return engine.process, engine.finish
+    # wbits=31: zlib deflate stream with a gzip header and trailer
+    engine = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return engine.compress, engine.flush
+
+
+def compress_chunks(chunks, encoding, level):
+    """Compress an iterable of byte chunks, yielding output as soon as the compressor has any."""
+    compress, finish = compressor(encoding, level)
+    for chunk in chunks:
+        if chunk:
+            data = compress(chunk)
+            if data:
+                yield data
+    data = finish()
+    if data:
+        yield data
+
+
+class CompressionMiddleware:
+    """Negotiates Content-Encoding and stream-compresses eligible responses."""
+
+    def __init__(self, app, level=6, brotli_quality=4, min_size=500):
+        self.app = app
+        self.levels = {'gzip': level, 'br': brotli_quality}
+        self.min_size = min_size
+
+    @staticmethod
+    def _compressible(code, headers):
+        """Whether a response of this kind may be sent compressed to clients that accept it."""
+        if code < 200 or code in (204, 206, 304):
+            return False
+        content_type = headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type not in COMPRESSIBLE_TYPES:
+            return False
+        return 'Content-Encoding' not in headers and 'no-transform' not in headers.get('Cache-Control', '')
+
+    def _large_enough(self, headers):
+        length = headers.get('Content-Length')
+        return length is None or int(length) >= self.min_size
+
+    @staticmethod
+    def _revalidates_variant(headers, if_none_match):
+        """Whether a 304 answers a client holding a response whose ETag this middleware weakened."""
+        etag = headers.get('Etag')
+        return bool(etag) and not etag.startswith('W/') and 'W/' + etag in if_none_match
+
+    @staticmethod
+    def _vary_headers(headers, lookup, drop=()):
+        """Return headers with Accept-Encoding added to Vary and the ETag made weak."""
+        vary = lookup.get('Vary')
+        etag = lookup.get('Etag')
+        headers = [(name, value) for name, value in headers
+                   if name.lower() not in ('vary', 'etag') + drop]
+        if not vary:
+            vary = 'Accept-Encoding'
+        elif 'accept-encoding' not in vary.lower():
+            vary += ', Accept-Encoding'
+        headers.append(('Vary', vary))
+        # The compressed body differs byte for byte, so the tag becomes weak
+        if etag:
+            headers.append(('ETag', etag if etag.startswith('W/') else 'W/' + etag))
+        return headers
+
+    def __call__(self, environ, start_response):
+        encoding = negotiate(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        if environ.get('REQUEST_METHOD') == 'HEAD':
+            encoding = None
+        if_none_match = environ.get('HTTP_IF_NONE_MATCH', '')
+        compressing = []
+
+        def start(status, headers, exc_info=None):
+            code = int(status.split(' ', 1)[0])
+            lookup = {name.title(): value for name, value in headers}
+            if code == 304:
+                if self._revalidates_variant(lookup, if_none_match):
+                    headers = self._vary_headers(headers, lookup)
+            elif self._compressible(code, lookup):
+                if encoding is not None and self._large_enough(lookup):
+                    compressing.append(True)
+                    headers = self._vary_headers(headers, lookup, drop=('content-length',))
+                    headers.append(('Content-Encoding', encoding))
+                else:
+                    headers = self._vary_headers(headers, lookup)
+            return start_response(status, headers, exc_info)
+
+        app_iter = self.app(environ, start)
+        if not compressing:
+            return app_iter
+        body = compress_chunks(app_iter, encoding, self.levels[encoding])
+        return ClosingIterator(body, getattr(app_iter, 'close', None))
+
+
+def init_compression(app):
+    """Wrap the app's WSGI callable in the compression middleware if enabled."""
+    if not app.config.get('COMPRESSION_ENABLED', True):
+        return
+    app.wsgi_app = CompressionMiddleware(
+        app.wsgi_app,
+        level=app.config.get('COMPRESSION_LEVEL', 6),
+        brotli_quality=app.config.get('COMPRESSION_BROTLI_QUALITY', 4),
+        min_size=app.config.get('COMPRESSION_MIN_SIZE', 500))
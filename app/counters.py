@@ -0,0 +1,38 @@
+"""
+Global Counters for Placement Preparation Portal
+=================================================
+Table counts shown on the student and admin dashboards. They change only when
+content is edited, so they are served from a TTL cache and invalidated
+explicitly by the routes that write to the counted tables.
+"""
+
+from flask import current_app
+from app.cache import TTLCache, register_cache
+from app.models import User, Category, Question, Resource, QuizResult
+
+COUNTED_MODELS = {
+    'users': User,
+    'categories': Category,
+    'questions': Question,
+    'resources': Resource,
+    'quiz_results': QuizResult,
+}
+
+counter_cache = register_cache(TTLCache('counters'))
+
+
+def get_count(name):
+    """Return the (possibly cached) row count of a counted table."""
+    model = COUNTED_MODELS[name]
+    ttl = current_app.config.get('COUNTER_CACHE_TTL', 60)
+    return counter_cache.get(name, lambda: model.query.count(), ttl=ttl)
+
+
+def get_counts(*names):
+    """Return {name: count} for the given counted tables."""
+    return {name: get_count(name) for name in names}
+
+
+def invalidate_counts(*names):
+    """Invalidate cached counts after a write to the given tables."""
+    counter_cache.invalidate(*names)
@@ -0,0 +1,218 @@
+"""
+Template Fragment Cache for Placement Preparation Portal
+=========================================================
+A Jinja extension that caches the rendered output of a template block:
+
+    {% cache 'sidebar:links', 600 %} ... {% endcache %}
+    {% cache ('categories', current_user.id, scores), 600 %} ... {% endcache %}
+
+The key is a string ("namespace:rest") or a tuple/list whose first item is
+the namespace; anything that changes the output (a user ID, a score) should
+be part of it. The TTL is optional and defaults to FRAGMENT_CACHE_TTL.
+
+Admin routes call invalidate_fragments(namespace) after writes. Each
+namespace has a generation number that is part of every stored key, so
+invalidating a namespace is a single increment; the orphaned entries age out
+through the LRU bound.
+
+Two backends are available (FRAGMENT_CACHE_BACKEND): 'memory', a per-process
+LRU cache registered with the cache statistics, and 'sqlite', a file shared
+by every process on the host. The memory backend keeps its generations in
+the watermarks table, read at most every FRAGMENT_CACHE_GENERATION_TTL
+seconds, so an invalidation reaches every process.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from sqlalchemy import update
+from app import db
+from app.cache import TTLCache, register_cache
+from app.models import Watermark
+
+
+def _watermark_name(namespace):
+    return f'fragments:{namespace}'
+
+
+class MemoryBackend:
+    """Per-process fragment store: an LRU-bounded TTL cache; namespace generations are shared watermarks."""
+
+    def __init__(self, maxsize, generation_ttl=5):
+        self.cache = register_cache(TTLCache('fragments', maxsize=maxsize))
+        self.generations = register_cache(TTLCache('fragment_generations'))
+        self.generation_ttl = generation_ttl
+
+    def _load_generation(self, namespace):
+        position = db.session.query(Watermark.position)\
+            .filter(Watermark.name == _watermark_name(namespace)).scalar()
+        return position or 0
+
+    def generation(self, namespace):
+        return self.generations.get(namespace, lambda: self._load_generation(namespace),
+                                    ttl=self.generation_ttl)
+
+    def fetch(self, key, render, ttl):
+        return self.cache.get(key, render, ttl=ttl)
+
+    def invalidate(self, namespace):
+        name = _watermark_name(namespace)
+        bumped = db.session.execute(
+            update(Watermark).where(Watermark.name == name)
+            .values(position=Watermark.position + 1, updated_at=datetime.utcnow())).rowcount
+        if not bumped:
+            db.session.add(Watermark(name=name, position=1, updated_at=datetime.utcnow()))
+        db.session.commit()
+        self.generations.invalidate(namespace)
+        self.cache.invalidations += 1
+
+
+class SQLiteBackend:
+    """
+    Fragment store in a SQLite file shared between processes. Entries past
+    maxsize are evicted least recently used first; eviction runs every
+    EVICT_EVERY writes so the table count is not taken on each one.
+    """
+
+    EVICT_EVERY = 64
+
+    def __init__(self, path, maxsize):
+        self.path = path
+        self.maxsize = maxsize
+        self._local = threading.local()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.name = 'fragments'
+        register_cache(self)
+
+        connection = self._connection()
+        connection.execute('CREATE TABLE IF NOT EXISTS fragments ('
+                           'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                           'expires_at REAL NOT NULL, used_at REAL NOT NULL)')
+        connection.execute('CREATE INDEX IF NOT EXISTS ix_fragments_used_at ON fragments (used_at)')
+        connection.execute('CREATE TABLE IF NOT EXISTS fragment_namespaces ('
+                           'name TEXT PRIMARY KEY, generation INTEGER NOT NULL)')
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def generation(self, namespace):
+        row = self._connection().execute(
+            'SELECT generation FROM fragment_namespaces WHERE name = ?', (namespace,)).fetchone()
+        return row[0] if row else 0
+
+    def fetch(self, key, render, ttl):
+        connection = self._connection()
+        now = time.time()
+        row = connection.execute('SELECT value FROM fragments WHERE key = ? AND expires_at > ?',
+                                 (key, now)).fetchone()
+        if row is not None:
+            self.hits += 1
+            connection.execute('UPDATE fragments SET used_at = ? WHERE key = ?', (now, key))
+            return row[0]
+
+        self.misses += 1
+        value = render()
+        connection.execute('INSERT OR REPLACE INTO fragments (key, value, expires_at, used_at) '
+                           'VALUES (?, ?, ?, ?)', (key, value, now + ttl, now))
+        self._writes += 1
+        if self._writes % self.EVICT_EVERY == 0:
+            self._evict(connection, now)
+        return value
+
+    def _evict(self, connection, now):
+        connection.execute('DELETE FROM fragments WHERE expires_at <= ?', (now,))
+        excess = connection.execute('SELECT count(*) FROM fragments').fetchone()[0] - self.maxsize
+        if excess > 0:
+            connection.execute('DELETE FROM fragments WHERE key IN '
+                               '(SELECT key FROM fragments ORDER BY used_at LIMIT ?)', (excess,))
+
+    def invalidate(self, namespace):
+        self._connection().execute(
+            'INSERT INTO fragment_namespaces (name, generation) VALUES (?, 1) '
+            'ON CONFLICT(name) DO UPDATE SET generation = generation + 1', (namespace,))
+        self.invalidations += 1
+
+    def stats(self):
+        """Return hit/miss counters in the same shape as TTLCache.stats()."""
+        lookups = self.hits + self.misses
+        entries = self._connection().execute('SELECT count(*) FROM fragments').fetchone()[0]
+        return {
+            'entries': entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def create_backend(app):
+    """Create the fragment store configured by FRAGMENT_CACHE_BACKEND."""
+    maxsize = app.config.get('FRAGMENT_CACHE_SIZE', 1000)
+    if app.config.get('FRAGMENT_CACHE_BACKEND', 'memory') == 'sqlite':
+        path = app.config.get('FRAGMENT_CACHE_PATH') or os.path.join(app.instance_path, 'fragments.db')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return SQLiteBackend(path, maxsize)
+    return MemoryBackend(maxsize, app.config.get('FRAGMENT_CACHE_GENERATION_TTL', 5))
+
+
+def split_key(key):
+    """Return (namespace, rest) of a fragment key."""
+    if isinstance(key, (tuple, list)):
+        return str(key[0]), ':'.join(str(part) for part in key[1:])
+    namespace, _, rest = str(key).partition(':')
+    return namespace, rest
+
+
+class FragmentCacheExtension(Extension):
+    """Adds the {% cache key[, ttl] %}...{% endcache %} tag."""
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        if parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        else:
+            args.append(nodes.Const(None))
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_render', args), [], [], body).set_lineno(lineno)
+
+    def _render(self, key, ttl, caller):
+        backend = current_app.extensions.get('fragment_cache')
+        if backend is None or not current_app.config.get('FRAGMENT_CACHE_ENABLED', True):
+            return caller()
+
+        namespace, rest = split_key(key)
+        ttl = current_app.config.get('FRAGMENT_CACHE_TTL', 300) if ttl is None else ttl
+        stored_key = f'{namespace}:{backend.generation(namespace)}:{rest}'
+        return Markup(backend.fetch(stored_key, lambda: str(caller()), ttl))
+
+
+def init_fragment_cache(app):
+    """Register the {% cache %} tag and the configured backend on an app."""
+    app.extensions['fragment_cache'] = create_backend(app)
+    app.jinja_env.add_extension(FragmentCacheExtension)
+
+
+def invalidate_fragments(*namespaces):
+    """Make every cached fragment in the given namespaces stale."""
+    backend = current_app.extensions.get('fragment_cache')
+    if backend is not None:
+        for namespace in namespaces:
+            backend.invalidate(namespace)
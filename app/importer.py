@@ -0,0 +1,212 @@
+"""
+Bulk Question Import for Placement Preparation Portal
+======================================================
+Streams questions from a CSV or JSON Lines file, validates each row, skips
+questions already in the bank (or repeated in the file) using an in-memory
+hash set, and inserts the rest in large executemany batches. Rows that are
+near-duplicates of existing questions (or of earlier rows) are imported but
+flagged in the report, using the MinHash/LSH index in app.near_duplicates.
+
+Each row needs question_text, option_a..option_d, correct_answer (A-D) and
+either category_id or category (the category name). explanation and
+difficulty (easy/medium/hard) are optional.
+"""
+
+import csv
+import hashlib
+import io
+import json
+from sqlalchemy import insert
+from app import db
+from app.models import Category, Question
+from app.quiz.question_bank import question_bank
+from app.counters import invalidate_counts
+from app.near_duplicates import near_duplicates
+
+FIELDS = ('question_text', 'option_a', 'option_b', 'option_c', 'option_d',
+          'correct_answer', 'explanation', 'difficulty')
+REQUIRED = ('question_text', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_answer')
+ANSWERS = ('A', 'B', 'C', 'D')
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+
+class ImportReport:
+    """Outcome of an import: counts plus per-row errors (line number, message)."""
+
+    def __init__(self, max_errors=1000):
+        self.inserted = 0
+        self.duplicates = 0
+        self.error_count = 0
+        self.errors = []
+        self.max_errors = max_errors
+        self.category_ids = set()
+        self.near_duplicate_count = 0
+        self.near_duplicates = []
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line, message))
+
+    def add_near_duplicate(self, line, question_text, matches):
+        """Record a row similar to existing questions; matches are (question_id or ('line', n), similarity)."""
+        self.near_duplicate_count += 1
+        if len(self.near_duplicates) < self.max_errors:
+            self.near_duplicates.append((line, question_text, matches))
+
+    @property
+    def rows(self):
+        return self.inserted + self.duplicates + self.error_count
+
+    def summary(self):
+        return (f'{self.inserted} inserted, {self.duplicates} duplicates skipped, '
+                f'{self.error_count} rows with errors, '
+                f'{self.near_duplicate_count} possible near-duplicates flagged')
+
+
+def question_fingerprint(category_id, question_text):
+    """Hash a question by category and normalised text (case and whitespace insensitive)."""
+    normalised = ' '.join((question_text or '').split()).casefold()
+    return hashlib.blake2b(f'{category_id}:{normalised}'.encode(), digest_size=16).digest()
+
+
+def existing_fingerprints(batch_size=10000):
+    """Build the fingerprint set of every question already in the bank."""
+    rows = db.session.query(Question.category_id, Question.question_text).yield_per(batch_size)
+    return {question_fingerprint(category_id, text) for category_id, text in rows}
+
+
+def read_rows(stream, fmt):
+    """Yield (line_number, row_dict) from a text stream in 'csv' or 'jsonl' format."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                yield line_number, exc
+                continue
+            yield line_number, row
+    else:
+        raise ValueError(f'Unsupported import format: {fmt}')
+
+
+def detect_format(filename):
+    """Guess the import format from a file name."""
+    return 'jsonl' if filename.lower().endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+
+def _validate(row, categories_by_name, category_ids):
+    """Return (question_values, None) for a valid row or (None, error_message)."""
+    if not isinstance(row, dict):
+        return None, 'Row is not an object'
+
+    values = {field: (str(row.get(field)).strip() if row.get(field) is not None else None)
+              for field in FIELDS}
+    missing = [field for field in REQUIRED if not values[field]]
+    if missing:
+        return None, f'Missing {", ".join(missing)}'
+
+    values['correct_answer'] = values['correct_answer'].upper()
+    if values['correct_answer'] not in ANSWERS:
+        return None, f'correct_answer must be one of {", ".join(ANSWERS)}'
+
+    if values['difficulty']:
+        values['difficulty'] = values['difficulty'].lower()
+        if values['difficulty'] not in DIFFICULTIES:
+            return None, f'difficulty must be one of {", ".join(DIFFICULTIES)}'
+
+    category_id = row.get('category_id')
+    if category_id not in (None, ''):
+        try:
+            category_id = int(category_id)
+        except (TypeError, ValueError):
+            return None, f'Invalid category_id {category_id!r}'
+        if category_id not in category_ids:
+            return None, f'Unknown category_id {category_id}'
+    else:
+        name = (row.get('category') or '').strip()
+        category_id = categories_by_name.get(name.casefold())
+        if category_id is None:
+            return None, f'Unknown category {name!r}' if name else 'Missing category or category_id'
+
+    values['category_id'] = category_id
+    return values, None
+
+
+def import_rows(rows, batch_size=5000, report=None, check_similar=True):
+    """
+    Import (line_number, row) pairs. Returns an ImportReport.
+    Each batch is inserted with one executemany and committed on its own, so a
+    failure only loses the batch in flight. check_similar=False skips the
+    near-duplicate check, e.g. for trusted seed data.
+    """
+    report = report or ImportReport()
+    categories = db.session.query(Category.id, Category.name).all()
+    categories_by_name = {name.casefold(): category_id for category_id, name in categories}
+    category_ids = {category_id for category_id, _ in categories}
+    seen = existing_fingerprints()
+    similar = near_duplicates.batch() if check_similar else None
+
+    try:
+        batch = []
+        for line, row in rows:
+            if isinstance(row, Exception):
+                report.add_error(line, f'Invalid JSON: {row}')
+                continue
+
+            values, error = _validate(row, categories_by_name, category_ids)
+            if error:
+                report.add_error(line, error)
+                continue
+
+            fingerprint = question_fingerprint(values['category_id'], values['question_text'])
+            if fingerprint in seen:
+                report.duplicates += 1
+                continue
+            seen.add(fingerprint)
+
+            if similar is not None:
+                matches = similar.check(line, values['question_text'])
+                if matches:
+                    report.add_near_duplicate(line, values['question_text'], matches)
+
+            batch.append(values)
+            if len(batch) >= batch_size:
+                _insert_batch(batch, report)
+                batch = []
+
+        if batch:
+            _insert_batch(batch, report)
+    finally:
+        # Also after a failed batch, so the rows committed so far are indexed
+        if similar is not None:
+            similar.close()
+    _invalidate_caches(report)
+    return report
+
+
+def import_file(stream, fmt, batch_size=5000, check_similar=True):
+    """Import questions from a binary or text stream in 'csv' or 'jsonl' format."""
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    return import_rows(read_rows(stream, fmt), batch_size=batch_size, check_similar=check_similar)
+
+
+def _insert_batch(batch, report):
+    db.session.execute(insert(Question), batch)
+    db.session.commit()
+    report.inserted += len(batch)
+    report.category_ids.update(values['category_id'] for values in batch)
+
+
+def _invalidate_caches(report):
+    if report.category_ids:
+        question_bank.invalidate(*report.category_ids)
+    if report.inserted:
+        invalidate_counts('questions')
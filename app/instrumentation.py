@@ -0,0 +1,159 @@
+"""
+Request Instrumentation for Placement Preparation Portal
+=========================================================
+Counts and times the SQL each request runs using SQLAlchemy engine events,
+and times template rendering with Flask's template signals. Every response
+gets a Server-Timing header:
+
+    Server-Timing: db;dur=4.1;desc="7 queries", render;dur=2.3, total;dur=9.8
+
+Statements are grouped by shape (the SQL text with whitespace and IN lists
+normalised); when one shape runs SQL_N_PLUS_ONE_THRESHOLD times or more in a
+request, a likely N+1 pattern, it is logged as a warning with the endpoint.
+
+For tests, assert_max_queries() fails when a block issues too many queries:
+
+    with assert_max_queries(5):
+        client.get('/quiz/history')
+"""
+
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from flask import before_render_template, current_app, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+from app import db
+
+# "IN (?, ?, ?)" and "VALUES (?, ?), (?, ?)" vary with the number of items
+_IN_LIST = re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)')
+_VALUES_ROWS = re.compile(r'(VALUES\s*\([^)]*\))(?:\s*,\s*\([^)]*\))+', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def statement_shape(statement):
+    """Normalise a SQL statement so repeats of the same query compare equal."""
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    shape = _VALUES_ROWS.sub(r'\1, ...', shape)
+    return _IN_LIST.sub('(?, ...)', shape)
+
+
+class QueryRecorder:
+    """Collects (shape, milliseconds) for every statement its thread executes while it is active."""
+
+    def __init__(self):
+        self.queries = []
+        self.thread_id = threading.get_ident()
+
+    def add(self, statement, duration_ms):
+        self.queries.append((statement_shape(statement), duration_ms))
+
+    def __len__(self):
+        return len(self.queries)
+
+    @property
+    def total_ms(self):
+        return sum(duration for _, duration in self.queries)
+
+    def repeated(self, threshold):
+        """Return [(shape, count)] of shapes executed at least threshold times, most frequent first."""
+        counts = Counter(shape for shape, _ in self.queries)
+        return [(shape, count) for shape, count in counts.most_common() if count >= threshold]
+
+
+# Recorders outside a request (assert_max_queries), keyed by id()
+_active_recorders = {}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_start_time'].pop()
+    duration_ms = (time.perf_counter() - started) * 1000
+    if has_request_context():
+        recorder = g.get('sql_queries')
+        if recorder is not None:
+            recorder.add(statement, duration_ms)
+    thread_id = threading.get_ident()
+    for recorder in list(_active_recorders.values()):
+        if recorder.thread_id == thread_id:
+            recorder.add(statement, duration_ms)
+
+
+def _handle_error(context):
+    # after_cursor_execute does not run for failed statements
+    if context.connection is not None and context.connection.info.get('query_start_time'):
+        context.connection.info['query_start_time'].pop()
+
+
+def _start_request():
+    g.sql_queries = QueryRecorder()
+    g.render_ms = 0.0
+    g.request_started = time.perf_counter()
+
+
+def _before_render(sender, template, context, **extra):
+    if has_request_context() and 'request_started' in g:
+        g.render_started = time.perf_counter()
+
+
+def _after_render(sender, template, context, **extra):
+    if has_request_context() and g.get('render_started') is not None:
+        g.render_ms += (time.perf_counter() - g.render_started) * 1000
+        g.render_started = None
+
+
+def _finish_request(response):
+    recorder = g.get('sql_queries')
+    if recorder is None:
+        return response
+
+    threshold = current_app.config.get('SQL_N_PLUS_ONE_THRESHOLD', 5)
+    for shape, count in recorder.repeated(threshold):
+        current_app.logger.warning('Possible N+1 in %s: %d x %s', request.endpoint, count, shape)
+
+    if current_app.config.get('SERVER_TIMING_HEADER', True):
+        total_ms = (time.perf_counter() - g.request_started) * 1000
+        response.headers['Server-Timing'] = (
+            f'db;dur={recorder.total_ms:.1f};desc="{len(recorder)} queries", '
+            f'render;dur={g.render_ms:.1f}, total;dur={total_ms:.1f}')
+    return response
+
+
+def init_instrumentation(app):
+    """Attach the query listeners to the app's engine and the per-request hooks."""
+    if not app.config.get('SQL_INSTRUMENTATION', True):
+        return
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+
+
+@contextmanager
+def count_queries():
+    """Record every query the instrumented engines run inside the block."""
+    recorder = QueryRecorder()
+    _active_recorders[id(recorder)] = recorder
+    try:
+        yield recorder
+    finally:
+        _active_recorders.pop(id(recorder), None)
+
+
+@contextmanager
+def assert_max_queries(limit):
+    """Fail with the list of statements if the block runs more than limit queries."""
+    with count_queries() as recorder:
+        yield recorder
+    if len(recorder) > limit:
+        listing = '\n'.join(f'  {shape}' for shape, _ in recorder.queries)
+        raise AssertionError(f'{len(recorder)} queries executed, expected at most {limit}:\n{listing}')
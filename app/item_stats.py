@@ -0,0 +1,153 @@
+"""
+Question Item Statistics for Placement Preparation Portal
+==========================================================
+Maintains the question_stats table: how often each question was answered,
+how often correctly, and how well answering it correctly tracks the overall
+score of the attempt (the discrimination index). Questions that almost
+everyone gets right or wrong, or whose discrimination is negative (often a
+wrong answer key), stand out on the admin question list.
+
+The job is incremental: a watermark remembers the last quiz_answers row that
+was folded in, and each run only reads the answers written since then. A run
+first claims its range by moving the watermark with a conditional UPDATE, so
+two runs started together (the admin button and the CLI) never fold in the
+same answers twice; the later one finds nothing left to do.
+"""
+
+from datetime import datetime
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import Question, QuestionStats, QuizAnswer, QuizResult, Watermark
+from app.quiz.question_bank import question_bank
+
+WATERMARK = 'question_stats'
+
+# Order of the running sums kept per question while scanning answers
+FIELDS = ('attempts', 'correct', 'score_sum', 'score_sq_sum', 'correct_score_sum')
+
+
+def _collect(connection, after_id, upto_id, batch_size):
+    """Sum up every answer with an ID in (after_id, upto_id]; returns ({question_id: sums}, answers)."""
+    rows = connection.execute(
+        select(QuizAnswer.question_id, QuizAnswer.is_correct, QuizResult.percentage)
+        .join(QuizResult, QuizResult.id == QuizAnswer.result_id)
+        .where(QuizAnswer.id > after_id, QuizAnswer.id <= upto_id)
+        .execution_options(yield_per=batch_size))
+
+    sums = {}
+    answers = 0
+    for question_id, is_correct, percentage in rows:
+        score = percentage or 0.0
+        item = sums.get(question_id)
+        if item is None:
+            item = sums[question_id] = [0, 0, 0.0, 0.0, 0.0]
+        item[0] += 1
+        item[2] += score
+        item[3] += score * score
+        if is_correct:
+            item[1] += 1
+            item[4] += score
+        answers += 1
+    return sums, answers
+
+
+def _watermark_position(connection):
+    return connection.execute(select(Watermark.position).where(Watermark.name == WATERMARK)).scalar()
+
+
+def _claim(connection, now):
+    """
+    Move the watermark to the newest answer, provided no other run moved it
+    since it was read. Returns (after_id, upto_id), or None if another run
+    got there first. The claim is committed together with the statistics.
+    """
+    position = _watermark_position(connection)
+    if position is None:
+        try:
+            connection.execute(insert(Watermark).values(name=WATERMARK, position=0, updated_at=now))
+            connection.commit()
+        except IntegrityError:  # created by a concurrent run
+            connection.rollback()
+        position = _watermark_position(connection)
+    # Make the conditional UPDATE the first statement of a fresh transaction
+    connection.rollback()
+
+    newest = select(func.coalesce(func.max(QuizAnswer.id), position)).scalar_subquery()
+    claimed = connection.execute(
+        update(Watermark).where(Watermark.name == WATERMARK, Watermark.position == position)
+        .values(position=newest, updated_at=now)).rowcount
+    if not claimed:
+        connection.rollback()
+        return None
+    return position, _watermark_position(connection)
+
+
+def _fold(connection, sums, now):
+    """Add the summed answers to question_stats; returns the IDs of the categories touched."""
+    inserts, updates, category_ids = [], [], set()
+    question_ids = list(sums)
+    for start in range(0, len(question_ids), 500):
+        chunk = question_ids[start:start + 500]
+
+        # Answers to deleted questions are skipped
+        categories = dict(connection.execute(
+            select(Question.id, Question.category_id).where(Question.id.in_(chunk))).all())
+        existing = {row.question_id: row for row in connection.execute(
+            select(QuestionStats.question_id, *[getattr(QuestionStats, f) for f in FIELDS])
+            .where(QuestionStats.question_id.in_(chunk)))}
+
+        for question_id in chunk:
+            if question_id not in categories:
+                continue
+            category_ids.add(categories[question_id])
+            values = dict(zip(FIELDS, sums[question_id]), question_id=question_id, updated_at=now)
+            current = existing.get(question_id)
+            if current is None:
+                inserts.append(values)
+            else:
+                for field in FIELDS:
+                    values[field] += getattr(current, field)
+                updates.append(values)
+
+    if inserts:
+        connection.execute(insert(QuestionStats), inserts)
+    if updates:
+        stats = QuestionStats.__table__
+        connection.execute(
+            update(stats).where(stats.c.question_id == bindparam('_question_id'))
+            .values({field: bindparam(field) for field in FIELDS + ('updated_at',)}),
+            [dict(values, _question_id=values['question_id']) for values in updates])
+    return category_ids, len(inserts) + len(updates)
+
+
+def update_item_stats(batch_size=5000):
+    """
+    Fold the answers written since the last run into question_stats.
+    Runs on a connection of its own, so the caller's session is left alone.
+    Returns (answers_processed, questions_updated).
+    """
+    now = datetime.utcnow()
+    with db.engine.connect() as connection:
+        claim = _claim(connection, now)
+        if claim is None:
+            return 0, 0
+        # Closing the connection without a commit (on an error) releases the claim
+        sums, answers = _collect(connection, *claim, batch_size)
+        category_ids, questions = _fold(connection, sums, now)
+        connection.commit()
+
+    # Measured difficulties may have changed the sampling buckets
+    if category_ids:
+        question_bank.invalidate(*category_ids)
+    return answers, questions
+
+
+def rebuild_item_stats(batch_size=5000):
+    """Forget all item statistics and recompute them from every stored answer."""
+    db.session.query(QuestionStats).delete()
+    watermark = db.session.get(Watermark, WATERMARK)
+    if watermark is not None:
+        watermark.position = 0
+    db.session.commit()
+    return update_item_stats(batch_size=batch_size)
@@ -0,0 +1,219 @@
+"""
+Leaderboards for Placement Preparation Portal
+==============================================
+Each user's best percentage per category (and the sum of those bests for the
+overall board) is kept in the indexed leaderboard_entries table and updated
+incrementally whenever a quiz is submitted, so nothing is computed from the
+quiz_results table at view time.
+
+Top-N lists are read from the (scope, score, achieved_at) index and cached.
+Ranks are answered from an in-process sorted list of scores per board with a
+binary search, and that list is patched in place on every update, once the
+transaction that made the update has committed.
+"""
+
+import bisect
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import event, func, insert, select, update
+from sqlalchemy.orm import aliased
+from app import db
+from app.cache import TTLCache, register_cache
+from app.models import LeaderboardEntry, QuizResult, User
+
+OVERALL = LeaderboardEntry.OVERALL
+
+top_cache = register_cache(TTLCache('leaderboards'))
+
+# Session.info key of the board changes waiting for their transaction to commit
+PENDING_MOVES = 'leaderboard_moves'
+
+
+class Leaderboards:
+    """Incrementally maintained per-category and overall leaderboards."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._scores = {}
+
+    def _sorted_scores(self, scope):
+        """Return the ascending list of scores on a board, loading it if needed."""
+        ttl = current_app.config.get('LEADERBOARD_CACHE_TTL', 300)
+        entry = self._scores.get(scope)
+        if entry is not None and time.monotonic() - entry[0] < ttl:
+            return entry[1]
+
+        scores = [score for (score,) in db.session.query(LeaderboardEntry.score)
+                  .filter(LeaderboardEntry.scope == scope)
+                  .order_by(LeaderboardEntry.score)]
+        with self._lock:
+            self._scores[scope] = (time.monotonic(), scores)
+        return scores
+
+    def _move(self, scope, old_score, new_score):
+        """Queue replacing old_score by new_score in a board; applied when the session commits."""
+        db.session.info.setdefault(PENDING_MOVES, []).append((scope, old_score, new_score))
+
+    def _apply(self, moves):
+        """Patch the loaded boards with committed moves without reloading them."""
+        with self._lock:
+            for scope, old_score, new_score in moves:
+                top_cache.invalidate(scope)
+                entry = self._scores.get(scope)
+                if entry is None:
+                    continue
+                scores = entry[1]
+                if old_score is not None:
+                    index = bisect.bisect_left(scores, old_score)
+                    if index < len(scores) and scores[index] == old_score:
+                        del scores[index]
+                bisect.insort(scores, new_score)
+
+    def _upsert(self, scope, user_id, score, achieved_at):
+        """Set a user's score on a board; returns the previous score (or None)."""
+        entry = db.session.get(LeaderboardEntry, (scope, user_id))
+        if entry is None:
+            db.session.add(LeaderboardEntry(scope=scope, user_id=user_id,
+                                            score=score, achieved_at=achieved_at))
+            old_score = None
+        else:
+            old_score = entry.score
+            entry.score = score
+            entry.achieved_at = achieved_at
+        self._move(scope, old_score, score)
+        return old_score
+
+    def record(self, user_id, category_id, percentage, achieved_at=None):
+        """
+        Fold a new quiz result into the boards. Only improvements on the
+        user's best score for the category change anything. The caller commits.
+        """
+        percentage = percentage or 0.0
+        achieved_at = achieved_at or datetime.utcnow()
+
+        entry = db.session.get(LeaderboardEntry, (category_id, user_id))
+        if entry is not None and entry.score >= percentage:
+            return False
+
+        old_best = self._upsert(category_id, user_id, percentage, achieved_at)
+        overall = db.session.get(LeaderboardEntry, (OVERALL, user_id))
+        overall_score = (overall.score if overall else 0.0) + percentage - (old_best or 0.0)
+        self._upsert(OVERALL, user_id, round(overall_score, 2), achieved_at)
+        return True
+
+    def top(self, scope, limit=None):
+        """Return the top entries of a board as dicts with competition ranks (1, 2, 2, 4)."""
+        limit = limit or current_app.config.get('LEADERBOARD_SIZE', 10)
+        ttl = current_app.config.get('LEADERBOARD_CACHE_TTL', 300)
+        rows = top_cache.get(scope, lambda: self._load_top(scope), ttl=ttl)
+        return rows[:limit]
+
+    def _load_top(self, scope):
+        size = current_app.config.get('LEADERBOARD_SIZE', 10)
+        rows = db.session.query(LeaderboardEntry.user_id, User.name,
+                                LeaderboardEntry.score, LeaderboardEntry.achieved_at)\
+            .join(User, User.id == LeaderboardEntry.user_id)\
+            .filter(LeaderboardEntry.scope == scope)\
+            .order_by(LeaderboardEntry.score.desc(), LeaderboardEntry.achieved_at)\
+            .limit(size).all()
+
+        entries = []
+        for position, (user_id, name, score, achieved_at) in enumerate(rows, start=1):
+            rank = entries[-1]['rank'] if entries and entries[-1]['score'] == score else position
+            entries.append({'rank': rank, 'user_id': user_id, 'name': name,
+                            'score': score, 'achieved_at': achieved_at})
+        return entries
+
+    def rank(self, scope, user_id):
+        """Return (rank, score, board_size) for a user, or None if they are not on the board."""
+        entry = db.session.get(LeaderboardEntry, (scope, user_id))
+        if entry is None:
+            return None
+        scores = self._sorted_scores(scope)
+        higher = len(scores) - bisect.bisect_right(scores, entry.score)
+        return higher + 1, entry.score, len(scores)
+
+    def remove_category(self, category_id):
+        """
+        Drop a category's board and take its scores back out of the overall
+        board; users left with no category entries leave it. The caller
+        commits, then calls clear().
+        """
+        removed = aliased(LeaderboardEntry)
+        category_score = select(removed.score)\
+            .where(removed.scope == category_id, removed.user_id == LeaderboardEntry.user_id)\
+            .scalar_subquery()
+        db.session.execute(
+            update(LeaderboardEntry)
+            .where(LeaderboardEntry.scope == OVERALL,
+                   LeaderboardEntry.user_id.in_(select(removed.user_id).where(removed.scope == category_id)))
+            .values(score=func.round(LeaderboardEntry.score - category_score, 2)),
+            execution_options={'synchronize_session': False})
+        db.session.query(LeaderboardEntry).filter(LeaderboardEntry.scope == category_id)\
+            .delete(synchronize_session=False)
+
+        remaining = select(removed.user_id).where(removed.scope != OVERALL)
+        db.session.query(LeaderboardEntry)\
+            .filter(LeaderboardEntry.scope == OVERALL, LeaderboardEntry.user_id.not_in(remaining))\
+            .delete(synchronize_session=False)
+
+    def clear(self):
+        """Forget every cached board."""
+        with self._lock:
+            self._scores.clear()
+        top_cache.invalidate()
+
+
+def rebuild_leaderboards(batch_size=10000):
+    """
+    Recompute every board from the quiz_results table, streaming results in
+    (taken_at, id) order so each best score keeps the time it was first reached.
+    """
+    best = {}
+    rows = db.session.query(QuizResult.user_id, QuizResult.category_id,
+                            QuizResult.percentage, QuizResult.taken_at)\
+        .order_by(QuizResult.taken_at, QuizResult.id)\
+        .yield_per(batch_size)
+
+    for user_id, category_id, percentage, taken_at in rows:
+        percentage = percentage or 0.0
+        current = best.get((user_id, category_id))
+        if current is None or percentage > current[0]:
+            best[(user_id, category_id)] = (percentage, taken_at)
+
+    overall = {}
+    for (user_id, _), (score, achieved_at) in best.items():
+        total, latest = overall.get(user_id, (0.0, None))
+        latest = achieved_at if latest is None or (achieved_at and achieved_at > latest) else latest
+        overall[user_id] = (total + score, latest)
+
+    entries = [{'scope': category_id, 'user_id': user_id, 'score': score, 'achieved_at': achieved_at}
+               for (user_id, category_id), (score, achieved_at) in best.items()]
+    entries += [{'scope': OVERALL, 'user_id': user_id, 'score': round(score, 2), 'achieved_at': achieved_at}
+                for user_id, (score, achieved_at) in overall.items()]
+
+    db.session.query(LeaderboardEntry).delete()
+    for start in range(0, len(entries), batch_size):
+        db.session.execute(insert(LeaderboardEntry), entries[start:start + batch_size])
+    db.session.commit()
+
+    leaderboards.clear()
+    return len(entries)
+
+
+leaderboards = Leaderboards()
+
+
+@event.listens_for(db.session, 'after_commit')
+def _apply_committed_moves(session):
+    moves = session.info.pop(PENDING_MOVES, None)
+    if moves:
+        leaderboards._apply(moves)
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _discard_rolled_back_moves(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(PENDING_MOVES, None)
@@ -1,11 +1,17 @@
-from flask import Blueprint, render_template
+from flask import Blueprint, render_template, request, jsonify
 from flask_login import login_required, current_user
-from app.models import Resource, Category, Question, QuizResult
+from app.models import Resource, QuizResult, UserStats
+from app.counters import get_counts
+from app.search import search_resources as run_resource_search
+from app.pagination import get_page_size
+from app.response_cache import cached_page
+from app import db, activity_log
 
 main = Blueprint('main', __name__)
 
 
 @main.route('/')
+@cached_page
 def home():
     """Home page route."""
     return render_template('index.html')
@@ -19,33 +25,26 @@ def dashboard():
     recent_results = QuizResult.query.filter_by(user_id=current_user.id)\
         .order_by(QuizResult.taken_at.desc()).limit(5).all()
 
-    # Get categories count
-    categories_count = Category.query.count()
+    # Get global content counts from the counter cache
+    counts = get_counts('categories', 'questions', 'resources')
 
-    # Get questions count
-    questions_count = Question.query.count()
-
-    # Get total resources count
-    resources_count = Resource.query.count()
-
-    # Calculate average score if user has results
-    avg_score = 0
-    total_attempts = QuizResult.query.filter_by(user_id=current_user.id).count()
-    if total_attempts > 0:
-        total_percentage = sum(result.percentage for result in QuizResult.query.filter_by(user_id=current_user.id).all() if result.percentage)
-        avg_score = round(total_percentage / total_attempts, 2)
+    # Read attempt count and average score from the stats rollup
+    stats = db.session.get(UserStats, current_user.id)
+    total_attempts = stats.attempts if stats else 0
+    avg_score = stats.average_percentage if stats else 0
 
     return render_template('dashboard.html',
                            user=current_user,
                            recent_results=recent_results,
-                           categories_count=categories_count,
-                           questions_count=questions_count,
-                           resources_count=resources_count,
+                           categories_count=counts['categories'],
+                           questions_count=counts['questions'],
+                           resources_count=counts['resources'],
                            avg_score=avg_score,
                            total_attempts=total_attempts)
 
 
 @main.route('/resources')
+@cached_page
 def resources():
     """View all placement resources."""
     # Group resources by type
@@ -59,4 +58,32 @@ def resources():
             resources_by_type[res_type] = []
         resources_by_type[res_type].append(resource)
 
+    if current_user.is_authenticated:
+        activity_log.log(current_user.id, 'resource_view', 'Viewed placement resources')
+
     return render_template('resources.html', resources_by_type=resources_by_type)
+
+
+@main.route('/resources/search')
+def search_resources():
+    """Search placement resources, best match first."""
+    query = (request.args.get('q') or '').strip()
+    resource_type = request.args.get('type') or None
+    page = run_resource_search(query, resource_type=resource_type,
+                               cursor=request.args.get('after'),
+                               per_page=get_page_size())
+
+    if request.args.get('format') == 'json':
+        return jsonify({
+            'query': query,
+            'results': [{
+                'id': resource.id,
+                'title': resource.title,
+                'description': resource.description,
+                'resource_type': resource.resource_type,
+                'link': resource.link,
+            } for resource in page.items],
+            'next_cursor': page.next_cursor,
+        })
+
+    return render_template('search_resources.html', query=query, resource_type=resource_type, page=page)
@@ -17,6 +17,9 @@ class User(UserMixin, db.Model):
     Supports both student and admin roles.
     """
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_created_at', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -30,7 +33,14 @@ class User(UserMixin, db.Model):
     # Relationships
     quiz_results = db.relationship('QuizResult', backref='user', lazy='dynamic')
     resources = db.relationship('Resource', backref='author', lazy='dynamic')
-    activities = db.relationship('StudentActivity', backref='user', lazy='dynamic')
+    activities = db.relationship('StudentActivity', backref='user', lazy='dynamic',
+                                 cascade='all, delete-orphan')
+    stats = db.relationship('UserStats', backref='user', uselist=False,
+                            cascade='all, delete-orphan')
+    category_stats = db.relationship('UserCategoryStats', backref='user', lazy='dynamic',
+                                     cascade='all, delete-orphan')
+    leaderboard_entries = db.relationship('LeaderboardEntry', backref='user', lazy='dynamic',
+                                          cascade='all, delete-orphan')
 
     def set_password(self, password):
         """Hash and set the password for the user."""
@@ -60,6 +70,8 @@ class Category(db.Model):
     questions = db.relationship('Question', backref='category', lazy='dynamic',
                                cascade='all, delete-orphan')
     quiz_results = db.relationship('QuizResult', backref='category', lazy='dynamic')
+    user_stats = db.relationship('UserCategoryStats', backref='category', lazy='dynamic',
+                                 cascade='all, delete-orphan')
 
     def __repr__(self):
         return f'<Category {self.name} ({self.type})>'
@@ -71,6 +83,10 @@ class Question(db.Model):
     Supports multiple choice questions with 4 options.
     """
     __tablename__ = 'questions'
+    __table_args__ = (
+        db.Index('ix_questions_category_id', 'category_id'),
+        db.Index('ix_questions_created_at_id', 'created_at', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=False)
@@ -84,6 +100,10 @@ class Question(db.Model):
     difficulty = db.Column(db.String(20))  # 'easy', 'medium', 'hard'
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Relationships
+    stats = db.relationship('QuestionStats', backref='question', uselist=False,
+                            cascade='all, delete-orphan')
+
     def __repr__(self):
         return f'<Question {self.id}: {self.question_text[:50]}...>'
 
@@ -94,6 +114,11 @@ class QuizResult(db.Model):
     Stores score, total questions, and percentage for each quiz attempt.
     """
     __tablename__ = 'quiz_results'
+    __table_args__ = (
+        db.Index('ix_quiz_results_user_taken_at', 'user_id', 'taken_at'),
+        db.Index('ix_quiz_results_user_category_taken_at', 'user_id', 'category_id', 'taken_at'),
+        db.Index('ix_quiz_results_taken_at', 'taken_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -103,10 +128,199 @@ class QuizResult(db.Model):
     percentage = db.Column(db.Float)
     taken_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    answers = db.relationship('QuizAnswer', backref='result', lazy='dynamic',
+                              cascade='all, delete-orphan')
+
     def __repr__(self):
         return f'<QuizResult User:{self.user_id} Score:{self.score}/{self.total_questions}>'
 
 
+class QuizAnswer(db.Model):
+    """
+    QuizAnswer model recording what a user picked for each question of an attempt.
+    Written in bulk alongside the QuizResult it belongs to.
+    """
+    __tablename__ = 'quiz_answers'
+    __table_args__ = (
+        db.Index('ix_quiz_answers_result_id', 'result_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    result_id = db.Column(db.Integer, db.ForeignKey('quiz_results.id'), nullable=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), nullable=False)
+    chosen = db.Column(db.String(1))  # 'A'-'D', or None if unanswered
+    is_correct = db.Column(db.Boolean, nullable=False, default=False)
+
+    def __repr__(self):
+        return f'<QuizAnswer Result:{self.result_id} Question:{self.question_id} {self.chosen}>'
+
+
+class QuizAttempt(db.Model):
+    """
+    QuizAttempt model for quizzes in progress (database-backed attempt store).
+    Keyed by an opaque attempt ID; expired rows are purged in bulk.
+    """
+    __tablename__ = 'quiz_attempts'
+    __table_args__ = (
+        db.Index('ix_quiz_attempts_user_category', 'user_id', 'category_id'),
+        db.Index('ix_quiz_attempts_expires_at', 'expires_at'),
+    )
+
+    id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=False)
+    question_ids = db.Column(db.JSON, nullable=False)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f'<QuizAttempt {self.id} User:{self.user_id} Category:{self.category_id}>'
+
+
+class UserStats(db.Model):
+    """
+    UserStats model holding a per-user rollup of quiz attempts.
+    Maintained incrementally on every quiz submission.
+    """
+    __tablename__ = 'user_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    percentage_sum = db.Column(db.Float, nullable=False, default=0.0)
+    best_percentage = db.Column(db.Float)
+    latest_percentage = db.Column(db.Float)
+    last_taken_at = db.Column(db.DateTime)
+
+    @property
+    def average_percentage(self):
+        """Average percentage across all attempts."""
+        return round(self.percentage_sum / self.attempts, 2) if self.attempts else 0
+
+    def __repr__(self):
+        return f'<UserStats User:{self.user_id} Attempts:{self.attempts}>'
+
+
+class UserCategoryStats(db.Model):
+    """
+    UserCategoryStats model holding a per-user, per-category rollup of quiz attempts.
+    Maintained incrementally on every quiz submission.
+    """
+    __tablename__ = 'user_category_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), primary_key=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    percentage_sum = db.Column(db.Float, nullable=False, default=0.0)
+    best_percentage = db.Column(db.Float)
+    latest_percentage = db.Column(db.Float)
+    last_taken_at = db.Column(db.DateTime)
+
+    @property
+    def average_percentage(self):
+        """Average percentage across all attempts in this category."""
+        return round(self.percentage_sum / self.attempts, 2) if self.attempts else 0
+
+    def __repr__(self):
+        return f'<UserCategoryStats User:{self.user_id} Category:{self.category_id}>'
+
+
+class LeaderboardEntry(db.Model):
+    """
+    LeaderboardEntry model holding a user's best score on one leaderboard.
+    scope is a category ID, or OVERALL (0) for the overall board whose score
+    is the sum of the user's best percentages across categories.
+    """
+    __tablename__ = 'leaderboard_entries'
+
+    OVERALL = 0
+
+    scope = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    score = db.Column(db.Float, nullable=False)
+    achieved_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<LeaderboardEntry Scope:{self.scope} User:{self.user_id} Score:{self.score}>'
+
+
+# Serves top-N queries (ORDER BY score DESC, achieved_at) and rank counts per board
+db.Index('ix_leaderboard_entries_scope_score', LeaderboardEntry.scope,
+         LeaderboardEntry.score.desc(), LeaderboardEntry.achieved_at)
+
+
+class QuestionStats(db.Model):
+    """
+    QuestionStats model holding running item statistics for one question.
+    Stores sufficient statistics (counts and sums over answers, where the
+    total score of an answer is its attempt's percentage) so the correctness
+    rate and the discrimination index can be updated incrementally.
+    """
+    __tablename__ = 'question_stats'
+
+    # Correctness-rate thresholds for the measured difficulty of a question
+    EASY_RATE = 0.7
+    HARD_RATE = 0.4
+
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), primary_key=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    correct = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Float, nullable=False, default=0.0)
+    score_sq_sum = db.Column(db.Float, nullable=False, default=0.0)
+    correct_score_sum = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @property
+    def correct_rate(self):
+        """Share of answers that were correct (0-1), or None without answers."""
+        return self.correct / self.attempts if self.attempts else None
+
+    @property
+    def discrimination(self):
+        """Point-biserial correlation between answering correctly and the attempt's score."""
+        n = self.attempts
+        if not n:
+            return None
+        item_var = n * self.correct - self.correct ** 2
+        score_var = n * self.score_sq_sum - self.score_sum ** 2
+        if item_var <= 0 or score_var <= 1e-9:
+            return None
+        covariance = n * self.correct_score_sum - self.correct * self.score_sum
+        return round(covariance / (item_var * score_var) ** 0.5, 3)
+
+    @property
+    def measured_difficulty(self):
+        """Difficulty implied by the correctness rate, or None without answers."""
+        rate = self.correct_rate
+        return self.classify(rate) if rate is not None else None
+
+    @classmethod
+    def classify(cls, correct_rate):
+        """Map a correctness rate to 'easy', 'medium' or 'hard'."""
+        if correct_rate >= cls.EASY_RATE:
+            return 'easy'
+        if correct_rate < cls.HARD_RATE:
+            return 'hard'
+        return 'medium'
+
+    def __repr__(self):
+        return f'<QuestionStats Question:{self.question_id} Attempts:{self.attempts}>'
+
+
+class Watermark(db.Model):
+    """
+    Watermark model remembering how far an incremental job has processed a
+    table (the last row ID it has folded in), keyed by job name.
+    """
+    __tablename__ = 'watermarks'
+
+    name = db.Column(db.String(50), primary_key=True)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<Watermark {self.name}: {self.position}>'
+
+
 class Resource(db.Model):
     """
     Resource model for placement preparation materials.
@@ -133,6 +347,9 @@ class StudentActivity(db.Model):
     Logs various user actions like login, quiz attempts, and resource views.
     """
     __tablename__ = 'student_activities'
+    __table_args__ = (
+        db.Index('ix_student_activities_user_timestamp', 'user_id', 'timestamp'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
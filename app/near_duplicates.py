@@ -0,0 +1,260 @@
+"""
+Near-Duplicate Question Detection for Placement Preparation Portal
+===================================================================
+Finds questions whose text is almost the same (different punctuation, a
+reworded phrase) using MinHash signatures over character shingles and
+locality-sensitive hashing: each signature is cut into bands, and only
+questions sharing at least one band bucket are compared. A lookup therefore
+touches a handful of candidates instead of the whole bank.
+
+The index lives in memory. It is built once per process on first use,
+updated as questions are added, edited or deleted, and rebuilt after
+NEAR_DUPLICATE_INDEX_TTL seconds to pick up writes from other processes.
+"""
+
+import re
+import threading
+import time
+import numpy as np
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.models import Question
+
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# Upper bound on candidates compared per lookup, so banks full of templated
+# questions ("Question 1", "Question 2", ...) cannot make lookups linear
+MAX_CANDIDATES = 64
+
+# Multiply-shift hash family h(x) = ((a * x + b) mod 2**64) >> 32 with odd a;
+# uint64 arithmetic wraps, so no explicit modulo is needed
+_rng = np.random.RandomState(20240601)
+_A = _rng.randint(1, 2 ** 63 - 1, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.randint(0, 2 ** 63 - 1, size=NUM_PERM, dtype=np.uint64)
+_SHIFT = np.uint64(32)
+
+
+def normalise(text):
+    """Lower-case text and reduce it to words separated by single spaces."""
+    return ' '.join(re.findall(r'\w+', (text or '').casefold()))
+
+
+def shingle_values(text):
+    """
+    Return the SHINGLE_SIZE-byte shingles of the normalised text packed into
+    integers (array of uint64), computed for all positions at once.
+    """
+    data = np.frombuffer(normalise(text).encode(), dtype=np.uint8).astype(np.uint64)
+    if not len(data):
+        return data
+    if len(data) < SHINGLE_SIZE:
+        data = np.pad(data, (0, SHINGLE_SIZE - len(data)))
+    count = len(data) - SHINGLE_SIZE + 1
+    values = np.zeros(count, dtype=np.uint64)
+    for offset in range(SHINGLE_SIZE):
+        values |= data[offset:offset + count] << np.uint64(8 * offset)
+    return values
+
+
+def signature(text):
+    """Return the MinHash signature (NUM_PERM uint64 values) of a text, or None if it is empty."""
+    values = shingle_values(text)
+    if not len(values):
+        return None
+    return ((_A[:, None] * values[None, :] + _B[:, None]) >> _SHIFT).min(axis=1)
+
+
+def similarity(first, second):
+    """Estimate the Jaccard similarity of two texts from their signatures."""
+    return float(np.count_nonzero(first == second)) / NUM_PERM
+
+
+def _band_keys(sig):
+    """Return one bucket key per band of a signature (the band's raw bytes)."""
+    raw = sig.tobytes()
+    width = ROWS * 8
+    return [(band, raw[band * width:(band + 1) * width]) for band in range(BANDS)]
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index of question texts, keyed by question ID."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._signatures = {}
+        self._buckets = {}
+        self._built_at = None
+
+    def _threshold(self):
+        return current_app.config.get('NEAR_DUPLICATE_THRESHOLD', 0.7)
+
+    def _ensure_built(self):
+        ttl = current_app.config.get('NEAR_DUPLICATE_INDEX_TTL', 3600)
+        if self._built_at is None or time.monotonic() - self._built_at > ttl:
+            self.build()
+
+    def build(self, batch_size=10000):
+        """(Re)build the index from every question in the bank."""
+        rows = db.session.query(Question.id, Question.question_text).yield_per(batch_size)
+        signatures, buckets = {}, {}
+        for question_id, text in rows:
+            sig = signature(text)
+            if sig is None:
+                continue
+            signatures[question_id] = sig
+            for key in _band_keys(sig):
+                buckets.setdefault(key, set()).add(question_id)
+        with self._lock:
+            self._signatures, self._buckets = signatures, buckets
+            self._built_at = time.monotonic()
+
+    def invalidate(self):
+        """Drop the index; the next lookup rebuilds it."""
+        with self._lock:
+            self._built_at = None
+
+    def _add(self, key, sig):
+        with self._lock:
+            self._remove(key)
+            self._signatures[key] = sig
+            for band_key in _band_keys(sig):
+                self._buckets.setdefault(band_key, set()).add(key)
+
+    def _remove(self, key):
+        with self._lock:
+            sig = self._signatures.pop(key, None)
+            if sig is None:
+                return
+            for band_key in _band_keys(sig):
+                bucket = self._buckets.get(band_key)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self._buckets[band_key]
+
+    def add(self, question_id, text):
+        """Index (or re-index) a question."""
+        if self._built_at is None:
+            return
+        sig = signature(text)
+        if sig is None:
+            self._remove(question_id)
+        else:
+            self._add(question_id, sig)
+
+    def remove(self, question_id):
+        """Remove a question from the index."""
+        self._remove(question_id)
+
+    def _matches(self, sig, exclude=None, threshold=None):
+        threshold = self._threshold() if threshold is None else threshold
+        with self._lock:
+            candidates = set()
+            for band_key in _band_keys(sig):
+                for key in self._buckets.get(band_key, ()):
+                    if len(candidates) >= MAX_CANDIDATES:
+                        break
+                    candidates.add(key)
+            candidates.discard(exclude)
+            if not candidates:
+                return []
+            candidates = list(candidates)
+            matrix = np.array([self._signatures[key] for key in candidates])
+        scores = np.count_nonzero(matrix == sig, axis=1) / NUM_PERM
+        return sorted([(key, float(score)) for key, score in zip(candidates, scores) if score >= threshold],
+                      key=lambda item: -item[1])
+
+    def find(self, text, exclude=None, threshold=None, limit=5):
+        """Return [(question_id, similarity)] of indexed questions similar to text, best first."""
+        self._ensure_built()
+        sig = signature(text)
+        if sig is None:
+            return []
+        return self._matches(sig, exclude, threshold)[:limit]
+
+    def clusters(self, threshold=None):
+        """Group indexed questions into clusters of near-duplicates (lists of IDs, largest first)."""
+        self._ensure_built()
+        threshold = self._threshold() if threshold is None else threshold
+        parent = {}
+
+        def root(key):
+            while parent.get(key, key) != key:
+                parent[key] = parent.get(parent[key], parent[key])
+                key = parent[key]
+            return key
+
+        with self._lock:
+            for bucket in self._buckets.values():
+                members = sorted(bucket)
+                if len(members) < 2:
+                    continue
+                # Compare every member with the bucket's first one, keeping this linear
+                first = members[0]
+                for second in members[1:]:
+                    if root(first) == root(second):
+                        continue
+                    if similarity(self._signatures[first], self._signatures[second]) >= threshold:
+                        parent[root(second)] = root(first)
+
+        groups = {}
+        for key in set(parent) | set(parent.values()):
+            groups.setdefault(root(key), set()).add(key)
+        return sorted((sorted(group) for group in groups.values() if len(group) > 1),
+                      key=lambda group: (-len(group), group[0]))
+
+    def batch(self):
+        """Start a bulk session that can also flag near-duplicates among rows not yet inserted."""
+        self._ensure_built()
+        return _ImportBatch(self)
+
+
+class _ImportBatch:
+    """
+    Tracks rows of an import in progress in a private index under provisional
+    keys ('line', n), so rows within the same file can be matched against each
+    other without those keys ever reaching the shared index. On close the rows
+    that were inserted are added to the shared index under their IDs.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.rows = NearDuplicateIndex()
+        self.pending = {}
+        self.start_id = db.session.query(db.func.max(Question.id)).scalar() or 0
+
+    def check(self, line, text, limit=3):
+        """Return near-duplicates of a row ([(key, similarity)]) and remember the row."""
+        sig = signature(text)
+        if sig is None:
+            return []
+        matches = sorted(self.index._matches(sig) + self.rows._matches(sig),
+                         key=lambda item: -item[1])[:limit]
+        self.rows._add(('line', line), sig)
+        self.pending.setdefault(text, []).append(sig)
+        return matches
+
+    def close(self):
+        """Index the rows inserted during the import under their IDs; safe to call after a failure."""
+        try:
+            rows = db.session.query(Question.id, Question.question_text)\
+                .filter(Question.id > self.start_id).yield_per(10000)
+            for question_id, text in rows:
+                entries = self.pending.get(text)
+                if entries:
+                    self.index._add(question_id, entries.pop())
+                else:
+                    self.index.add(question_id, text)
+        except SQLAlchemyError:
+            # The session is unusable after a failed batch; rebuild from the committed rows instead
+            self.index.invalidate()
+        finally:
+            self.rows = None
+            self.pending = {}
+
+
+near_duplicates = NearDuplicateIndex()
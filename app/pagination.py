@@ -0,0 +1,85 @@
+"""
+Keyset Pagination for Placement Preparation Portal
+===================================================
+Paginates ordered queries by remembering the sort key of the last row shown
+instead of using OFFSET, so fetching page N costs the same as fetching page 1.
+Cursors are opaque, URL-safe tokens encoding that sort key.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from flask import current_app, request
+from sqlalchemy import tuple_
+
+
+class KeysetPage:
+    """One page of results plus the cursor for the page that follows it."""
+
+    def __init__(self, items, next_cursor, per_page):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.per_page = per_page
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def encode_cursor(values):
+    """Encode a row's sort key as an opaque URL-safe token."""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, columns):
+    """Decode a cursor produced by encode_cursor, or return None if it is invalid."""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            return None
+        return tuple(
+            datetime.fromisoformat(value) if column.type.python_type is datetime and value else value
+            for column, value in zip(columns, values)
+        )
+    except (ValueError, TypeError, binascii.Error, NotImplementedError):
+        return None
+
+
+def get_page_size(default_key='PER_PAGE', max_key='MAX_PER_PAGE'):
+    """Read ?per_page= from the request, clamped to the configured limits."""
+    default = current_app.config.get(default_key, 20)
+    maximum = current_app.config.get(max_key, 100)
+    per_page = request.args.get('per_page', default, type=int)
+    return max(1, min(per_page, maximum))
+
+
+def keyset_paginate(query, columns, cursor=None, per_page=20, key_of=None):
+    """
+    Return a KeysetPage of query ordered by columns, newest first.
+    columns must end with a unique column (usually the primary key) so the
+    sort key is a total order. For queries returning tuples, key_of picks the
+    object that carries the sort columns from each row.
+    """
+    after = decode_cursor(cursor, columns)
+    if after is not None:
+        query = query.filter(tuple_(*columns) < tuple_(*after))
+
+    rows = query.order_by(*[column.desc() for column in columns]).limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = key_of(rows[-1]) if key_of else rows[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in columns])
+    return KeysetPage(rows, next_cursor, per_page)
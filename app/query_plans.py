@@ -0,0 +1,165 @@
+"""
+Query Plan Regression Check for Placement Preparation Portal
+=============================================================
+Boots the application against a throwaway SQLite database, drives every
+route through the Flask test client, records the SQL each route issues and
+runs EXPLAIN QUERY PLAN on it. Any statement that falls back to a full table
+scan (a bare "SCAN <table>" step) is reported as a failure.
+
+Run it with:
+    flask --app run.py check-query-plans
+"""
+
+import os
+import re
+import tempfile
+from sqlalchemy import event
+
+# Tables that are expected to be read in full: both are small, admin-curated
+# lists that the pages display completely.
+ALLOWED_FULL_SCANS = {'categories', 'resources'}
+
+# Bare full-table scans, e.g. "SCAN quiz_results" (or "SCAN TABLE quiz_results"
+# on older SQLite versions). Index scans ("SCAN t USING INDEX ...") are allowed.
+FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)$')
+
+EXPLAINABLE = ('SELECT', 'UPDATE', 'DELETE', 'WITH')
+
+# (label, user, method, url, form data) for every route that is checked
+ROUTES = [
+    ('main.home', 'student', 'GET', '/', None),
+    ('main.dashboard', 'student', 'GET', '/dashboard', None),
+    ('main.resources', 'student', 'GET', '/resources', None),
+    ('main.search_resources', 'student', 'GET', '/resources/search?q=plan', None),
+    ('quiz.list_categories', 'student', 'GET', '/quiz/', None),
+    ('quiz.view_category', 'student', 'GET', '/quiz/category/1', None),
+    ('quiz.start_quiz', 'student', 'GET', '/quiz/start/1', None),
+    ('quiz.question', 'student', 'GET', '/quiz/question/1', None),
+    ('quiz.submit_quiz', 'student', 'POST', '/quiz/submit', {'question_1': 'A'}),
+    ('quiz.results', 'student', 'GET', '/quiz/results/1', None),
+    ('quiz.history', 'student', 'GET', '/quiz/history', None),
+    ('quiz.take_quiz', 'student', 'GET', '/quiz/take/2', None),
+    ('quiz.take_quiz[POST]', 'student', 'POST', '/quiz/take/2', {'question_13': 'A'}),
+    ('quiz.leaderboard', 'student', 'GET', '/quiz/leaderboard', None),
+    ('quiz.leaderboard[category]', 'student', 'GET', '/quiz/leaderboard/1', None),
+    ('admin.dashboard', 'admin', 'GET', '/admin/', None),
+    ('admin.list_users', 'admin', 'GET', '/admin/users', None),
+    ('admin.list_categories', 'admin', 'GET', '/admin/categories', None),
+    ('admin.list_questions', 'admin', 'GET', '/admin/questions', None),
+    ('admin.list_questions[category]', 'admin', 'GET', '/admin/questions?category_id=1', None),
+    ('admin.list_questions[difficulty]', 'admin', 'GET', '/admin/questions?difficulty=easy&per_page=5', None),
+    ('admin.list_questions[search]', 'admin', 'GET', '/admin/questions?q=question&category_id=1&per_page=5', None),
+    ('admin.update_question_stats', 'admin', 'POST', '/admin/questions/stats', None),
+    ('admin.edit_question', 'admin', 'GET', '/admin/questions/1/edit', None),
+    ('admin.create_question', 'admin', 'POST', '/admin/questions/create', {
+        'category_id': '1', 'question_text': 'Plan check question', 'option_a': 'a',
+        'option_b': 'b', 'option_c': 'c', 'option_d': 'd', 'correct_answer': 'A',
+        'explanation': '', 'difficulty': 'easy'}),
+    ('admin.duplicate_questions', 'admin', 'GET', '/admin/questions/duplicates', None),
+    ('admin.list_resources', 'admin', 'GET', '/admin/resources', None),
+    ('admin.toggle_role', 'admin', 'POST', '/admin/users/3/toggle-role', None),
+]
+
+
+def _seed(db):
+    """Create the minimal data set the checked routes need."""
+    from app.models import User, Category, Question, Resource
+
+    users = [
+        User(name='Plan Admin', email='admin@plan.check', role='admin'),
+        User(name='Plan Student', email='student@plan.check', role='student'),
+        User(name='Plan Other', email='other@plan.check', role='student'),
+    ]
+    for user in users:
+        user.set_password('password')
+    db.session.add_all(users)
+
+    categories = [Category(name='Aptitude', type='aptitude'), Category(name='Python', type='technical')]
+    db.session.add_all(categories)
+    db.session.flush()
+
+    for category in categories:
+        for number in range(12):
+            db.session.add(Question(
+                category_id=category.id, question_text=f'{category.name} question {number}',
+                option_a='a', option_b='b', option_c='c', option_d='d', correct_answer='A',
+                explanation='', difficulty=('easy', 'medium', 'hard')[number % 3]))
+    db.session.add(Resource(title='Plan resource', resource_type='notes', content='', created_by=1))
+    db.session.commit()
+
+
+def _explain(connection, statement, parameters):
+    """Return the detail column of EXPLAIN QUERY PLAN for a statement."""
+    if isinstance(parameters, list):
+        parameters = parameters[0] if parameters else ()
+    rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters or ()).fetchall()
+    return [row[-1] for row in rows]
+
+
+def full_scans(plan, allowed=ALLOWED_FULL_SCANS):
+    """Return the plan steps that scan a table without using an index."""
+    offending = []
+    for detail in plan:
+        match = FULL_SCAN.match(detail.strip())
+        if match and match.group(1) not in allowed:
+            offending.append(detail.strip())
+    return offending
+
+
+def check_query_plans(config_class, routes=ROUTES):
+    """
+    Drive the routes against a fresh database and return a list of
+    (label, statement, offending_plan_steps) for every full table scan found.
+    """
+    from app import create_app, db
+
+    fd, path = tempfile.mkstemp(suffix='.db', prefix='query-plans-')
+    os.close(fd)
+    check_config = type('QueryPlanConfig', (config_class,), {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + path,
+        'TESTING': True,
+        'WTF_CSRF_ENABLED': False,
+    })
+
+    try:
+        app = create_app(check_config)
+        with app.app_context():
+            _seed(db)
+            # The near-duplicate index reads the whole bank once per process
+            # by design; build it up front so routes only see their own SQL
+            from app.near_duplicates import near_duplicates
+            near_duplicates.build()
+            engine = db.engine
+
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            captured.append((statement, parameters))
+
+        clients = {}
+        for role, email in (('student', 'student@plan.check'), ('admin', 'admin@plan.check')):
+            clients[role] = app.test_client()
+            clients[role].post('/auth/login', data={'email': email, 'password': 'password'})
+
+        statements = []
+        event.listen(engine, 'before_cursor_execute', capture)
+        try:
+            for label, role, method, url, data in routes:
+                del captured[:]
+                clients[role].open(url, method=method, data=data)
+                statements.extend((label, statement, parameters) for statement, parameters in captured)
+        finally:
+            event.remove(engine, 'before_cursor_execute', capture)
+
+        failures = []
+        with app.app_context(), engine.connect() as connection:
+            for label, statement, parameters in statements:
+                if not statement.lstrip().upper().startswith(EXPLAINABLE):
+                    continue
+                offending = full_scans(_explain(connection, statement, parameters))
+                if offending:
+                    failures.append((label, statement, offending))
+        engine.dispose()
+        return failures
+    finally:
+        os.remove(path)
@@ -0,0 +1,172 @@
+"""
+Quiz Attempt Store for Placement Preparation Portal
+====================================================
+Quizzes in progress are kept on the server, keyed by an opaque attempt ID,
+so the session cookie only carries that ID. Two backends are available,
+selected with QUIZ_ATTEMPT_STORE:
+- 'memory': bounded in-process LRU, fastest, lost on restart
+- 'database': the quiz_attempts table, survives restarts and is shared
+  between worker processes
+Attempts expire after QUIZ_ATTEMPT_TTL seconds and expired attempts are
+purged in bulk, at most once per QUIZ_ATTEMPT_PURGE_INTERVAL.
+"""
+
+import secrets
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timedelta
+from flask import current_app
+from app import db
+from app.models import QuizAttempt
+
+Attempt = namedtuple('Attempt', ['id', 'user_id', 'category_id', 'question_ids',
+                                 'started_at', 'expires_at'])
+
+
+class AttemptStore:
+    """Interface shared by the attempt store backends."""
+
+    def __init__(self, ttl=7200, purge_interval=300):
+        self.ttl = ttl
+        self.purge_interval = purge_interval
+        self._last_purge = time.monotonic()
+
+    def create(self, user_id, category_id, question_ids):
+        """Store a new attempt and return it."""
+        self._maybe_purge()
+        now = datetime.utcnow()
+        attempt = Attempt(secrets.token_urlsafe(16), user_id, category_id, list(question_ids),
+                          now, now + timedelta(seconds=self.ttl))
+        self._save(attempt)
+        return attempt
+
+    def get(self, attempt_id):
+        """Return an unexpired attempt, or None."""
+        raise NotImplementedError
+
+    def find_active(self, user_id, category_id):
+        """Return the user's unexpired attempt for a category, or None."""
+        raise NotImplementedError
+
+    def delete(self, attempt_id):
+        """Remove an attempt once it has been submitted."""
+        raise NotImplementedError
+
+    def purge_expired(self):
+        """Delete every expired attempt in bulk. Returns the number removed."""
+        raise NotImplementedError
+
+    def _save(self, attempt):
+        raise NotImplementedError
+
+    def _maybe_purge(self):
+        if time.monotonic() - self._last_purge >= self.purge_interval:
+            self._last_purge = time.monotonic()
+            self.purge_expired()
+
+
+class MemoryAttemptStore(AttemptStore):
+    """In-process LRU of attempts, bounded to maxsize entries."""
+
+    def __init__(self, ttl=7200, purge_interval=300, maxsize=10000):
+        super().__init__(ttl, purge_interval)
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._attempts = OrderedDict()
+
+    def _save(self, attempt):
+        with self._lock:
+            self._attempts[attempt.id] = attempt
+            while len(self._attempts) > self.maxsize:
+                self._attempts.popitem(last=False)
+
+    def get(self, attempt_id):
+        with self._lock:
+            attempt = self._attempts.get(attempt_id)
+            if attempt is None:
+                return None
+            if attempt.expires_at <= datetime.utcnow():
+                del self._attempts[attempt_id]
+                return None
+            self._attempts.move_to_end(attempt_id)
+            return attempt
+
+    def find_active(self, user_id, category_id):
+        now = datetime.utcnow()
+        with self._lock:
+            for attempt in reversed(self._attempts.values()):
+                if attempt.user_id == user_id and attempt.category_id == category_id \
+                        and attempt.expires_at > now:
+                    return attempt
+        return None
+
+    def delete(self, attempt_id):
+        with self._lock:
+            self._attempts.pop(attempt_id, None)
+
+    def purge_expired(self):
+        now = datetime.utcnow()
+        with self._lock:
+            expired = [key for key, attempt in self._attempts.items() if attempt.expires_at <= now]
+            for key in expired:
+                del self._attempts[key]
+        return len(expired)
+
+
+class DatabaseAttemptStore(AttemptStore):
+    """Attempts stored in the quiz_attempts table."""
+
+    def _save(self, attempt):
+        db.session.add(QuizAttempt(**attempt._asdict()))
+        db.session.commit()
+
+    @staticmethod
+    def _to_attempt(row):
+        return Attempt(row.id, row.user_id, row.category_id, list(row.question_ids),
+                       row.started_at, row.expires_at)
+
+    def get(self, attempt_id):
+        row = db.session.get(QuizAttempt, attempt_id)
+        if row is None or row.expires_at <= datetime.utcnow():
+            return None
+        return self._to_attempt(row)
+
+    def find_active(self, user_id, category_id):
+        row = QuizAttempt.query.filter(
+            QuizAttempt.user_id == user_id,
+            QuizAttempt.category_id == category_id,
+            QuizAttempt.expires_at > datetime.utcnow()
+        ).order_by(QuizAttempt.expires_at.desc()).first()
+        return self._to_attempt(row) if row else None
+
+    def delete(self, attempt_id):
+        QuizAttempt.query.filter(QuizAttempt.id == attempt_id).delete(synchronize_session=False)
+
+    def purge_expired(self):
+        removed = QuizAttempt.query.filter(QuizAttempt.expires_at <= datetime.utcnow())\
+            .delete(synchronize_session=False)
+        db.session.commit()
+        return removed
+
+
+BACKENDS = {
+    'memory': MemoryAttemptStore,
+    'database': DatabaseAttemptStore,
+}
+
+
+def get_attempt_store():
+    """Return the application's attempt store, creating it on first use."""
+    store = current_app.extensions.get('quiz_attempt_store')
+    if store is None:
+        config = current_app.config
+        backend = BACKENDS[config.get('QUIZ_ATTEMPT_STORE', 'database')]
+        options = {
+            'ttl': config.get('QUIZ_ATTEMPT_TTL', 7200),
+            'purge_interval': config.get('QUIZ_ATTEMPT_PURGE_INTERVAL', 300),
+        }
+        if backend is MemoryAttemptStore:
+            options['maxsize'] = config.get('QUIZ_ATTEMPT_MAX_ENTRIES', 10000)
+        store = current_app.extensions['quiz_attempt_store'] = backend(**options)
+    return store
@@ -0,0 +1,59 @@
+"""
+Quiz Grading Engine for Placement Preparation Portal
+=====================================================
+Grades a quiz attempt against the cached per-category answer key in a single
+pass, so submitting a quiz costs at most one query regardless of how many
+questions were asked. The individual answers are then stored with one bulk
+insert.
+"""
+
+from collections import namedtuple
+from sqlalchemy import insert
+from app import db
+from app.models import Question, QuizAnswer
+from app.quiz.question_bank import question_bank
+
+GradedQuiz = namedtuple('GradedQuiz', ['score', 'total_questions', 'percentage', 'answers'])
+GradedAnswer = namedtuple('GradedAnswer', ['question_id', 'chosen', 'is_correct'])
+
+
+def grade_quiz(category_id, question_ids, form):
+    """
+    Grade the answers submitted in form for the given question IDs.
+    Answers are read from 'question_<id>' fields, matching the quiz templates.
+    """
+    answer_key = question_bank.answer_key(category_id)
+
+    # Questions moved out of the category since the quiz started are looked up in one query
+    missing = [qid for qid in question_ids if qid not in answer_key]
+    if missing:
+        answer_key = dict(answer_key)
+        answer_key.update(db.session.query(Question.id, Question.correct_answer)
+                          .filter(Question.id.in_(missing)).all())
+
+    score = 0
+    answers = []
+    for qid in question_ids:
+        chosen = form.get(f'question_{qid}')
+        chosen = chosen.upper() if chosen else None
+        correct_answer = answer_key.get(qid)
+        is_correct = chosen is not None and correct_answer is not None and chosen == correct_answer
+        if is_correct:
+            score += 1
+        answers.append(GradedAnswer(qid, chosen, is_correct))
+
+    total_questions = len(question_ids)
+    percentage = (score / total_questions * 100) if total_questions > 0 else 0
+
+    return GradedQuiz(score, total_questions, round(percentage, 2), answers)
+
+
+def save_answers(result_id, graded):
+    """Bulk insert one QuizAnswer row per graded question (the caller commits)."""
+    rows = [
+        {'result_id': result_id, 'question_id': answer.question_id,
+         'chosen': answer.chosen, 'is_correct': answer.is_correct}
+        for answer in graded.answers
+    ]
+    if rows:
+        db.session.execute(insert(QuizAnswer), rows)
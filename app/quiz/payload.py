@@ -0,0 +1,55 @@
+"""
+Quiz Attempt Payloads for Placement Preparation Portal
+=======================================================
+Builds the complete, answer-free content of a quiz attempt (category plus
+every question and its options) with a single query, and caches it per
+attempt and category content version. The JSON endpoint serves it with a
+strong ETag, and the per-question pages render from the same cached payload.
+"""
+
+import hashlib
+import json
+from flask import current_app, url_for
+from app import db
+from app.cache import TTLCache, register_cache
+from app.models import Category, Question
+from app.quiz.question_bank import question_bank
+
+payload_cache = register_cache(TTLCache('quiz_payloads', maxsize=5000))
+
+PUBLIC_FIELDS = ('id', 'question_text', 'option_a', 'option_b', 'option_c', 'option_d', 'difficulty')
+
+
+def _build_payload(attempt):
+    """Load the attempt's questions in one query and assemble the payload."""
+    columns = [getattr(Question, field) for field in PUBLIC_FIELDS]
+    rows = db.session.query(*columns).filter(Question.id.in_(attempt.question_ids)).all()
+    by_id = {row.id: dict(zip(PUBLIC_FIELDS, row)) for row in rows}
+
+    category = db.session.query(Category.id, Category.name)\
+        .filter(Category.id == attempt.category_id).first()
+
+    # Keep the attempt's order; questions deleted since the start are skipped
+    questions = [by_id[qid] for qid in attempt.question_ids if qid in by_id]
+    for number, question in enumerate(questions, start=1):
+        question['number'] = number
+
+    payload = {
+        'attempt_id': attempt.id,
+        'category': {'id': attempt.category_id, 'name': category.name if category else 'Unknown'},
+        'started_at': attempt.started_at.isoformat(),
+        'expires_at': attempt.expires_at.isoformat(),
+        'total_questions': len(questions),
+        'questions': questions,
+        'submit_url': url_for('quiz.submit_quiz'),
+    }
+    body = json.dumps(payload, separators=(',', ':'), sort_keys=True).encode()
+    etag = hashlib.sha1(body).hexdigest()
+    return payload, body, etag
+
+
+def get_payload(attempt):
+    """Return (payload, json_body, etag) for an attempt, from cache when possible."""
+    key = (attempt.id, question_bank.version(attempt.category_id))
+    ttl = current_app.config.get('QUIZ_PAYLOAD_CACHE_TTL', 600)
+    return payload_cache.get(key, lambda: _build_payload(attempt), ttl=ttl)
@@ -0,0 +1,204 @@
+"""
+Question Bank Index for Placement Preparation Portal
+=====================================================
+This module keeps a lightweight, per-category index of question IDs in memory
+so that starting a quiz never has to load full Question rows, together with a
+compact answer key used for grading. Admin question writes invalidate the
+affected categories and the next reader rebuilds them with a single query.
+
+Invalidation also bumps a question bank version in the watermarks table, so
+other processes drop their copies too: the answer key checks it on every
+use, so grading never uses an outdated key, and the index checks it at
+most every QUESTION_BANK_VERSION_TTL seconds.
+"""
+
+import random
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import update
+from app import db
+from app.cache import TTLCache, register_cache
+from app.models import Question, QuestionStats, Watermark
+
+BANK_VERSION = 'question_bank'
+
+version_cache = register_cache(TTLCache('question_bank_version'))
+
+
+def _load_shared_version():
+    position = db.session.query(Watermark.position).filter(Watermark.name == BANK_VERSION).scalar()
+    return position or 0
+
+
+def _bump_shared_version():
+    bumped = db.session.execute(
+        update(Watermark).where(Watermark.name == BANK_VERSION)
+        .values(position=Watermark.position + 1, updated_at=datetime.utcnow())).rowcount
+    if not bumped:
+        db.session.add(Watermark(name=BANK_VERSION, position=1, updated_at=datetime.utcnow()))
+    db.session.commit()
+    version_cache.invalidate()
+
+
+class QuestionBank:
+    """
+    In-process index of question IDs and answer keys, grouped by category.
+    Every category carries a version, (local counter, shared bank version),
+    that changes on invalidation in any process, so cached data built from an
+    older version is not served.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._indexes = {}
+
+    def version(self, category_id, fresh=False):
+        """
+        Return the current content version of a category. The shared part is
+        read from the database if fresh, else from a short-lived cache.
+        """
+        if fresh:
+            shared = _load_shared_version()
+        else:
+            ttl = current_app.config.get('QUESTION_BANK_VERSION_TTL', 5)
+            shared = version_cache.get(BANK_VERSION, _load_shared_version, ttl=ttl)
+        return self._versions.get(category_id, 0), shared
+
+    def invalidate(self, *category_ids):
+        """
+        Drop cached data for the given categories, or for every category if none
+        are given. Call after committing the change; other processes see it via
+        the shared version, which is bumped once per call.
+        """
+        with self._lock:
+            category_ids = category_ids or list(set(self._versions) | set(self._indexes))
+            for cat_id in category_ids:
+                self._versions[cat_id] = self._versions.get(cat_id, 0) + 1
+                self._indexes.pop(cat_id, None)
+        _bump_shared_version()
+
+    def _cached(self, category_id, kind, build, fresh=False):
+        """Return cached data of the given kind for a category, rebuilding it if stale."""
+        ttl = current_app.config.get('QUESTION_INDEX_TTL', 300)
+        version = self.version(category_id, fresh=fresh)
+        entry = self._indexes.get(category_id, {}).get(kind)
+        if entry and entry['version'] == version \
+                and time.monotonic() - entry['built_at'] < ttl:
+            return entry['data']
+
+        data = build(category_id)
+
+        with self._lock:
+            # Only publish the data if no admin write happened while building it
+            if self._versions.get(category_id, 0) == version[0]:
+                self._indexes.setdefault(category_id, {})[kind] = {
+                    'version': version,
+                    'built_at': time.monotonic(),
+                    'data': data,
+                }
+        return data
+
+    def _index(self, category_id):
+        """Return (all_ids, ids_by_difficulty) for a category."""
+        return self._cached(category_id, 'index', _build_index)
+
+    def answer_key(self, category_id):
+        """Return the {question_id: correct_answer} key for a category, checked against the shared version."""
+        return self._cached(category_id, 'answer_key', _build_answer_key, fresh=True)
+
+    def question_ids(self, category_id):
+        """Return every question ID in a category, in ID order."""
+        all_ids, _ = self._index(category_id)
+        return all_ids
+
+    def count(self, category_id):
+        """Return the number of questions in a category."""
+        all_ids, _ = self._index(category_id)
+        return len(all_ids)
+
+    def sample(self, category_id, k, difficulty_mix=None, rng=random):
+        """
+        Pick up to k distinct question IDs uniformly at random.
+
+        difficulty_mix is an optional mapping such as
+        {'easy': 3, 'medium': 5, 'hard': 2}; its values are treated as weights.
+        Buckets that run short are topped up uniformly from the rest of the
+        category. The cost depends on k, not on the size of the category.
+        """
+        all_ids, by_difficulty = self._index(category_id)
+        k = min(k, len(all_ids))
+        if k == 0:
+            return []
+        if k == len(all_ids):
+            selected = list(all_ids)
+            rng.shuffle(selected)
+            return selected
+
+        selected = []
+        if difficulty_mix:
+            for difficulty, quota in _allocate(difficulty_mix, k).items():
+                bucket = by_difficulty.get(difficulty, ())
+                selected.extend(rng.sample(bucket, min(quota, len(bucket))))
+
+        # Top up uniformly from the whole category, skipping IDs already chosen
+        chosen = set(selected)
+        while len(selected) < k:
+            question_id = all_ids[rng.randrange(len(all_ids))]
+            if question_id not in chosen:
+                chosen.add(question_id)
+                selected.append(question_id)
+
+        rng.shuffle(selected)
+        return selected
+
+
+def _build_index(category_id):
+    """
+    Load (id, difficulty) pairs for a category with a single ID-only query.
+    With QUIZ_DIFFICULTY_SOURCE = 'measured', questions answered at least
+    ITEM_STATS_MIN_ATTEMPTS times are bucketed by their measured difficulty.
+    """
+    query = db.session.query(Question.id, Question.difficulty)
+    measured = current_app.config.get('QUIZ_DIFFICULTY_SOURCE') == 'measured'
+    if measured:
+        query = query.add_columns(QuestionStats.attempts, QuestionStats.correct)\
+            .outerjoin(QuestionStats, QuestionStats.question_id == Question.id)
+    rows = query.filter(Question.category_id == category_id)\
+        .order_by(Question.id).all()
+
+    min_attempts = current_app.config.get('ITEM_STATS_MIN_ATTEMPTS', 20)
+    by_difficulty = {}
+    for question_id, difficulty, *stats in rows:
+        if measured and stats[0] and stats[0] >= min_attempts:
+            difficulty = QuestionStats.classify(stats[1] / stats[0])
+        by_difficulty.setdefault(difficulty, []).append(question_id)
+    all_ids = tuple(row[0] for row in rows)
+    return all_ids, {key: tuple(ids) for key, ids in by_difficulty.items()}
+
+
+def _build_answer_key(category_id):
+    """Load the compact answer key for a category with a single query."""
+    rows = db.session.query(Question.id, Question.correct_answer)\
+        .filter(Question.category_id == category_id).all()
+    return dict(rows)
+
+
+def _allocate(weights, k):
+    """Split k slots across difficulties in proportion to weights (largest remainder)."""
+    weights = {key: float(value) for key, value in weights.items() if value and value > 0}
+    total = sum(weights.values())
+    if not total:
+        return {}
+
+    shares = {key: k * value / total for key, value in weights.items()}
+    quotas = {key: int(share) for key, share in shares.items()}
+    leftover = k - sum(quotas.values())
+    for key in sorted(shares, key=lambda key: shares[key] - quotas[key], reverse=True)[:leftover]:
+        quotas[key] += 1
+    return quotas
+
+
+question_bank = QuestionBank()
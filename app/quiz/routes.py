@@ -6,14 +6,21 @@ This module handles all quiz-related functionality including:
 - Starting and taking quizzes
 - Submitting answers
 - Viewing results
+- Leaderboards
 """
 
-from flask import Blueprint, render_template, redirect, url_for, flash, request, session
+from flask import Blueprint, render_template, redirect, url_for, flash, request, session, current_app, jsonify, abort
 from flask_login import login_required, current_user
-from app.models import Category, Question, QuizResult, StudentActivity
-from app import db
-from datetime import datetime
-import random
+from app.models import Category, Question, QuizResult, QuizAnswer, UserCategoryStats
+from app.quiz.question_bank import question_bank
+from app.quiz.grading import grade_quiz, save_answers
+from app.quiz.attempts import get_attempt_store
+from app.quiz.payload import get_payload
+from app.stats import record_quiz_result, best_scores
+from app.leaderboard import leaderboards, OVERALL
+from app.counters import invalidate_counts
+from app.pagination import keyset_paginate, get_page_size
+from app import db, activity_log
 
 quiz = Blueprint('quiz', __name__)
 
@@ -26,13 +33,8 @@ def list_categories():
     aptitude_categories = Category.query.filter_by(type='aptitude').order_by(Category.name).all()
     technical_categories = Category.query.filter_by(type='technical').order_by(Category.name).all()
 
-    # Get user's best scores for each category
-    category_scores = {}
-    results = QuizResult.query.filter_by(user_id=current_user.id).all()
-    for result in results:
-        cat_id = result.category_id
-        if cat_id not in category_scores or result.percentage > category_scores[cat_id]:
-            category_scores[cat_id] = result.percentage
+    # Get user's best scores for each category from the stats rollup
+    category_scores = best_scores(current_user.id)
 
     return render_template('quiz/categories.html',
                            aptitude_categories=aptitude_categories,
@@ -45,54 +47,77 @@ def list_categories():
 def view_category(category_id):
     """View category details and start quiz."""
     category = Category.query.get_or_404(category_id)
-    questions_count = Question.query.filter_by(category_id=category_id).count()
+    questions_count = question_bank.count(category_id)
+
+    # Get one page of the user's previous attempts for this category
+    query = QuizResult.query.filter_by(user_id=current_user.id, category_id=category_id)
+    page = keyset_paginate(query, (QuizResult.taken_at, QuizResult.id),
+                           cursor=request.args.get('after'),
+                           per_page=get_page_size('HISTORY_PER_PAGE'))
+
+    if request.args.get('format') == 'json':
+        return jsonify({
+            'category': {'id': category.id, 'name': category.name},
+            'attempts': [_result_json(result) for result in page.items],
+            'next_cursor': page.next_cursor,
+        })
 
-    # Get user's previous attempts for this category
-    previous_attempts = QuizResult.query.filter_by(
-        user_id=current_user.id,
-        category_id=category_id
-    ).order_by(QuizResult.taken_at.desc()).all()
+    stats = db.session.get(UserCategoryStats, (current_user.id, category_id))
 
     return render_template('quiz/category.html',
                            category=category,
                            questions_count=questions_count,
-                           previous_attempts=previous_attempts)
+                           previous_attempts=page.items,
+                           page=page,
+                           attempts_count=stats.attempts if stats else 0)
 
 
 @quiz.route('/start/<int:category_id>', methods=['GET', 'POST'])
 @login_required
 def start_quiz(category_id):
-    """Start a new quiz attempt. Fetch 10 random questions and store in session."""
+    """Start a new quiz attempt, or resume the user's unexpired attempt for this category."""
     category = Category.query.get_or_404(category_id)
+    store = get_attempt_store()
+
+    attempt = store.find_active(current_user.id, category_id)
+    if attempt is not None:
+        session['quiz_attempt_id'] = attempt.id
+        flash('Resuming your quiz in progress.', 'info')
+        return redirect(url_for('quiz.question', question_num=1, attempt=attempt.id))
+
+    # Sample question IDs from the in-memory index (or all if fewer are available)
+    question_ids = question_bank.sample(
+        category_id,
+        current_app.config['QUIZ_QUESTION_COUNT'],
+        difficulty_mix=current_app.config.get('QUIZ_DIFFICULTY_MIX')
+    )
 
-    # Get all questions for this category
-    all_questions = Question.query.filter_by(category_id=category_id).all()
-
-    if not all_questions:
+    if not question_ids:
         flash('No questions available in this category.', 'warning')
         return redirect(url_for('quiz.list_categories'))
 
-    # Select 10 random questions (or all if less than 10)
-    num_questions = min(10, len(all_questions))
-    selected_questions = random.sample(all_questions, num_questions)
+    num_questions = len(question_ids)
 
-    # Store question IDs and quiz start time in session
-    question_ids = [q.id for q in selected_questions]
-    session['quiz_question_ids'] = question_ids
-    session['quiz_category_id'] = category_id
-    session['quiz_start_time'] = datetime.utcnow().isoformat()
+    # Keep the attempt on the server; the session only carries its ID
+    attempt = store.create(current_user.id, category_id, question_ids)
+    session['quiz_attempt_id'] = attempt.id
 
     # Log activity
-    activity = StudentActivity(
-        user_id=current_user.id,
-        activity_type='quiz_start',
-        description=f'Started quiz for category: {category.name}'
-    )
-    db.session.add(activity)
-    db.session.commit()
+    activity_log.log(current_user.id, 'quiz_start', f'Started quiz for category: {category.name}')
 
     flash(f'Quiz started! You have {num_questions} questions to answer.', 'success')
-    return redirect(url_for('quiz.question', question_num=1))
+    return redirect(url_for('quiz.question', question_num=1, attempt=attempt.id))
+
+
+def _current_attempt():
+    """Return the attempt named by ?attempt= (or the session) if it belongs to the user."""
+    attempt_id = request.values.get('attempt') or session.get('quiz_attempt_id')
+    if not attempt_id:
+        return None
+    attempt = get_attempt_store().get(attempt_id)
+    if attempt is None or attempt.user_id != current_user.id:
+        return None
+    return attempt
 
 
 @quiz.route('/question/<int:question_num>')
@@ -100,60 +125,64 @@ def start_quiz(category_id):
 def question(question_num):
     """Display a specific question."""
     # Check if quiz is in progress
-    if 'quiz_question_ids' not in session:
+    attempt = _current_attempt()
+    if attempt is None:
         flash('No quiz in progress. Please start a new quiz.', 'warning')
         return redirect(url_for('quiz.list_categories'))
 
-    question_ids = session.get('quiz_question_ids', [])
-    category_id = session.get('quiz_category_id')
+    # Render from the cached attempt payload instead of querying per question
+    payload, _, _ = get_payload(attempt)
+    questions = payload['questions']
 
-    if question_num < 1 or question_num > len(question_ids):
+    if question_num < 1 or question_num > len(questions):
         flash('Invalid question number.', 'error')
         return redirect(url_for('quiz.list_categories'))
 
-    # Get the current question
-    question_id = question_ids[question_num - 1]
-    question = Question.query.get_or_404(question_id)
-
-    # Get category info
-    category = Category.query.get(category_id)
-
     # Calculate progress
-    progress = (question_num / len(question_ids)) * 100
+    progress = (question_num / len(questions)) * 100
 
     return render_template('quiz/question.html',
                            title=f'Question {question_num}',
-                           question=question,
+                           question=questions[question_num - 1],
                            question_num=question_num,
-                           total_questions=len(question_ids),
-                           category=category,
-                           progress=progress)
+                           total_questions=len(questions),
+                           category=payload['category'],
+                           progress=progress,
+                           attempt=attempt)
+
+
+@quiz.route('/attempt/<attempt_id>')
+@login_required
+def attempt_payload(attempt_id):
+    """Return the whole attempt (questions and options, no answers) as JSON with an ETag."""
+    attempt = get_attempt_store().get(attempt_id)
+    if attempt is None or attempt.user_id != current_user.id:
+        abort(404)
+
+    _, body, etag = get_payload(attempt)
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
 
 
 @quiz.route('/submit', methods=['POST'])
 @login_required
 def submit_quiz():
     """Submit quiz answers, calculate score, save QuizResult, log StudentActivity."""
-    if 'quiz_question_ids' not in session:
+    attempt = _current_attempt()
+    if attempt is None:
         flash('No quiz in progress.', 'warning')
         return redirect(url_for('quiz.list_categories'))
 
-    question_ids = session.get('quiz_question_ids', [])
-    category_id = session.get('quiz_category_id')
-    start_time_str = session.get('quiz_start_time')
+    question_ids = attempt.question_ids
+    category_id = attempt.category_id
 
-    # Calculate score
-    score = 0
-    total_questions = len(question_ids)
-
-    for qid in question_ids:
-        question = Question.query.get(qid)
-        answer = request.form.get(f'question_{qid}')
-        if answer and question and answer.upper() == question.correct_answer:
-            score += 1
-
-    # Calculate percentage
-    percentage = (score / total_questions * 100) if total_questions > 0 else 0
+    # Grade all answers against the cached answer key
+    graded = grade_quiz(category_id, question_ids, request.form)
+    score = graded.score
+    total_questions = graded.total_questions
+    percentage = graded.percentage
 
     # Create QuizResult
     quiz_result = QuizResult(
@@ -161,25 +190,27 @@ def submit_quiz():
         category_id=category_id,
         score=score,
         total_questions=total_questions,
-        percentage=round(percentage, 2)
+        percentage=percentage
     )
     db.session.add(quiz_result)
     db.session.flush()  # Get the ID without committing
+    save_answers(quiz_result.id, graded)
+    record_quiz_result(quiz_result)
+    get_attempt_store().delete(attempt.id)
+    db.session.commit()
+    invalidate_counts('quiz_results')
 
     # Log activity
     category = Category.query.get(category_id)
-    activity = StudentActivity(
-        user_id=current_user.id,
-        activity_type='quiz_complete',
-        description=f'Completed quiz for {category.name if category else "Unknown"}: Score {score}/{total_questions} ({percentage:.1f}%)'
+    activity_log.log(
+        current_user.id,
+        'quiz_complete',
+        f'Completed quiz for {category.name if category else "Unknown"}: Score {score}/{total_questions} ({percentage:.1f}%)'
     )
-    db.session.add(activity)
-    db.session.commit()
 
     # Clear quiz session data
-    session.pop('quiz_question_ids', None)
-    session.pop('quiz_category_id', None)
-    session.pop('quiz_start_time', None)
+    if session.get('quiz_attempt_id') == attempt.id:
+        session.pop('quiz_attempt_id', None)
 
     flash('Quiz submitted successfully!', 'success')
     return redirect(url_for('quiz.results', result_id=quiz_result.id))
@@ -190,39 +221,35 @@ def submit_quiz():
 def take_quiz(category_id):
     """Take the quiz - display questions and handle submission."""
     category = Category.query.get_or_404(category_id)
-    questions = Question.query.filter_by(category_id=category_id).all()
+    question_ids = question_bank.question_ids(category_id)
 
-    if not questions:
+    if not question_ids:
         flash('No questions available in this category.', 'warning')
         return redirect(url_for('quiz.list_categories'))
 
     if request.method == 'POST':
-        # Calculate score
-        score = 0
-        total_questions = len(questions)
-
-        for question in questions:
-            answer = request.form.get(f'question_{question.id}')
-            if answer and answer.upper() == question.correct_answer:
-                score += 1
-
-        # Calculate percentage
-        percentage = (score / total_questions * 100) if total_questions > 0 else 0
+        # Grade every question in the category without loading full rows
+        graded = grade_quiz(category_id, question_ids, request.form)
 
         # Save result
         result = QuizResult(
             user_id=current_user.id,
             category_id=category_id,
-            score=score,
-            total_questions=total_questions,
-            percentage=percentage
+            score=graded.score,
+            total_questions=graded.total_questions,
+            percentage=graded.percentage
         )
         db.session.add(result)
+        db.session.flush()
+        save_answers(result.id, graded)
+        record_quiz_result(result)
         db.session.commit()
+        invalidate_counts('quiz_results')
 
         flash('Quiz submitted successfully!', 'success')
         return redirect(url_for('quiz.results', result_id=result.id))
 
+    questions = Question.query.filter_by(category_id=category_id).all()
     return render_template('quiz/take.html', category=category, questions=questions)
 
 
@@ -239,28 +266,84 @@ def results(result_id):
         return redirect(url_for('quiz.list_categories'))
 
     category = Category.query.get(result.category_id)
-    questions = Question.query.filter_by(category_id=result.category_id).all()
+
+    # Load only the questions of this attempt, with the stored answers, in one query
+    answers = db.session.query(QuizAnswer, Question)\
+        .outerjoin(Question, Question.id == QuizAnswer.question_id)\
+        .filter(QuizAnswer.result_id == result.id)\
+        .order_by(QuizAnswer.id).all()
 
     return render_template('quiz/results.html',
                            result=result,
                            category=category,
-                           questions=questions)
+                           answers=answers)
 
 
 @quiz.route('/history')
 @login_required
 def history():
-    """View user's quiz attempt history."""
-    results = QuizResult.query.filter_by(user_id=current_user.id)\
-        .order_by(QuizResult.taken_at.desc()).all()
-
-    # Get category details for each result
-    results_with_categories = []
-    for result in results:
-        category = Category.query.get(result.category_id)
-        results_with_categories.append({
-            'result': result,
-            'category': category
+    """View one page of the user's quiz attempt history, newest first."""
+    # Category names come from the same query via an outer join
+    query = db.session.query(QuizResult, Category.name)\
+        .outerjoin(Category, Category.id == QuizResult.category_id)\
+        .filter(QuizResult.user_id == current_user.id)
+    page = keyset_paginate(query, (QuizResult.taken_at, QuizResult.id),
+                           cursor=request.args.get('after'),
+                           per_page=get_page_size('HISTORY_PER_PAGE'),
+                           key_of=lambda row: row[0])
+
+    if request.args.get('format') == 'json':
+        return jsonify({
+            'results': [_result_json(result, category_name) for result, category_name in page.items],
+            'next_cursor': page.next_cursor,
+        })
+
+    results_with_categories = [
+        {'result': result, 'category_name': category_name}
+        for result, category_name in page.items
+    ]
+
+    return render_template('quiz/history.html', results_with_categories=results_with_categories, page=page)
+
+
+@quiz.route('/leaderboard')
+@quiz.route('/leaderboard/<int:category_id>')
+@login_required
+def leaderboard(category_id=None):
+    """Show the top scorers overall or for one category, plus the user's own rank."""
+    category = Category.query.get_or_404(category_id) if category_id is not None else None
+    scope = category_id if category_id is not None else OVERALL
+
+    entries = leaderboards.top(scope)
+    my_rank = leaderboards.rank(scope, current_user.id)
+
+    if request.args.get('format') == 'json':
+        return jsonify({
+            'category': {'id': category.id, 'name': category.name} if category else None,
+            'entries': [dict(entry, achieved_at=entry['achieved_at'].isoformat() if entry['achieved_at'] else None)
+                        for entry in entries],
+            'me': {'rank': my_rank[0], 'score': my_rank[1], 'total': my_rank[2]} if my_rank else None,
         })
 
-    return render_template('quiz/history.html', results_with_categories=results_with_categories)
+    categories = Category.query.order_by(Category.name).all()
+    return render_template('quiz/leaderboard.html',
+                           category=category,
+                           categories=categories,
+                           entries=entries,
+                           my_rank=my_rank)
+
+
+def _result_json(result, category_name=None):
+    """Serialize a QuizResult for the JSON variants of the history pages."""
+    data = {
+        'id': result.id,
+        'category_id': result.category_id,
+        'score': result.score,
+        'total_questions': result.total_questions,
+        'percentage': result.percentage,
+        'taken_at': result.taken_at.isoformat() if result.taken_at else None,
+        'url': url_for('quiz.results', result_id=result.id),
+    }
+    if category_name is not None:
+        data['category_name'] = category_name
+    return data
@@ -0,0 +1,94 @@
+"""
+Response Caching for Placement Preparation Portal
+==================================================
+Pages that look the same for every anonymous visitor (the home page and the
+resources list) are rendered once and served from memory. Every response
+carries an ETag and a Last-Modified date, so browsers revalidating a page
+they already have get an empty 304 Not Modified.
+
+Cached pages are keyed by a content version stamp kept in the watermarks
+table. The admin resource routes bump it, which makes every cached page
+stale at once, in this process immediately and in other processes within
+RESPONSE_CACHE_VERSION_TTL seconds.
+"""
+
+import hashlib
+from datetime import datetime
+from functools import wraps
+from flask import current_app, make_response, request, session
+from flask_login import current_user
+from sqlalchemy import update
+from app import db
+from app.cache import TTLCache, register_cache
+from app.models import Watermark
+
+CONTENT_VERSION = 'content_version'
+
+page_cache = register_cache(TTLCache('pages', maxsize=256))
+version_cache = register_cache(TTLCache('content_version'))
+
+
+def _load_version():
+    watermark = db.session.get(Watermark, CONTENT_VERSION)
+    if watermark is None:
+        return 0, None
+    return watermark.position, watermark.updated_at
+
+
+def content_version():
+    """Return (version, last_modified) of the public content."""
+    ttl = current_app.config.get('RESPONSE_CACHE_VERSION_TTL', 5)
+    return version_cache.get(CONTENT_VERSION, _load_version, ttl=ttl)
+
+
+def bump_content_version():
+    """Mark the public content as changed so cached pages are re-rendered."""
+    now = datetime.utcnow()
+    bumped = db.session.execute(
+        update(Watermark).where(Watermark.name == CONTENT_VERSION)
+        .values(position=Watermark.position + 1, updated_at=now)).rowcount
+    if not bumped:
+        db.session.add(Watermark(name=CONTENT_VERSION, position=1, updated_at=now))
+    db.session.commit()
+    version_cache.invalidate()
+    page_cache.invalidate()
+
+
+def _cacheable():
+    """Only anonymous GETs without pending flash messages render the same for everyone."""
+    return (current_app.config.get('RESPONSE_CACHE_ENABLED', True)
+            and request.method in ('GET', 'HEAD')
+            and not current_user.is_authenticated
+            and '_flashes' not in session)
+
+
+def cached_page(view):
+    """Serve a view from the page cache for anonymous visitors, with conditional GET support."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not _cacheable():
+            return view(*args, **kwargs)
+
+        version, last_modified = content_version()
+        key = (request.endpoint, request.full_path, version)
+
+        def render():
+            response = make_response(view(*args, **kwargs))
+            body = response.get_data()
+            return (response.status_code, response.mimetype, body,
+                    hashlib.md5(body).hexdigest())
+
+        ttl = current_app.config.get('RESPONSE_CACHE_TTL', 300)
+        status, mimetype, body, etag = page_cache.get(key, render, ttl=ttl)
+        if status != 200:
+            page_cache.invalidate(key)
+
+        response = current_app.response_class(body, status=status, mimetype=mimetype)
+        response.set_etag(etag)
+        if last_modified is not None:
+            response.last_modified = last_modified
+        # Revalidate on every use; logged-in visitors get a different page
+        response.cache_control.no_cache = True
+        response.vary.add('Cookie')
+        return response.make_conditional(request)
+    return wrapper
@@ -0,0 +1,22 @@
+"""
+Schema Maintenance for Placement Preparation Portal
+====================================================
+db.create_all() only creates missing tables, so indexes declared on models
+that already exist in a database are never added. ensure_indexes() creates
+any missing index in place; it is idempotent and safe to run on every start.
+"""
+
+from app import db
+
+
+def ensure_indexes():
+    """Create every index declared on the models that is missing from the database."""
+    inspector = db.inspect(db.engine)
+    created = []
+    for table in db.metadata.sorted_tables:
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(db.engine)
+                created.append(index.name)
+    return created
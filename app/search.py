@@ -0,0 +1,179 @@
+"""
+Full-Text Search for Placement Preparation Portal
+==================================================
+Questions (text, options and explanation) and resources (title, description
+and content) are indexed in SQLite FTS5 tables that use the original tables
+as external content. Triggers on the original tables keep the indexes in
+sync, including rows written by bulk Core inserts such as the importer.
+
+Results are ranked by BM25 and paginated with a cursor over (rank, rowid),
+so later pages cost the same as the first. On databases without FTS5 (e.g.
+PostgreSQL) searches fall back to a case-insensitive LIKE filter.
+"""
+
+import re
+from flask import current_app
+from sqlalchemy import Float, Integer, column, or_, text
+from sqlalchemy.orm import joinedload
+from app import db
+from app.models import Question, Resource
+from app.pagination import KeysetPage, decode_cursor, encode_cursor, keyset_paginate
+
+# FTS table name -> (content table, indexed columns)
+INDEXES = {
+    'questions_fts': ('questions', ('question_text', 'option_a', 'option_b', 'option_c',
+                                    'option_d', 'explanation')),
+    'resources_fts': ('resources', ('title', 'description', 'content')),
+}
+
+# At most this many words of a search are used
+MAX_TERMS = 10
+
+# Pseudo-columns describing the (rank, rowid) search cursor
+CURSOR_COLUMNS = (column('rank', Float), column('rowid', Integer))
+
+
+def _ddl(name, table, columns):
+    """Return the statements creating an external-content FTS5 table and its sync triggers."""
+    cols = ', '.join(columns)
+    new_cols = ', '.join(f'new.{c}' for c in columns)
+    old_cols = ', '.join(f'old.{c}' for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {name} USING fts5({cols}, content='{table}', "
+        f"content_rowid='id', tokenize='porter unicode61')",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {name}(rowid, {cols}) VALUES (new.id, {new_cols}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {name}({name}, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_au AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {name}({name}, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); "
+        f"INSERT INTO {name}(rowid, {cols}) VALUES (new.id, {new_cols}); END",
+    ]
+
+
+def fts_available():
+    """Return True if the database is SQLite with the FTS5 extension."""
+    available = current_app.extensions.get('search_fts5')
+    if available is None:
+        available = False
+        if db.engine.dialect.name == 'sqlite':
+            with db.engine.connect() as connection:
+                available = bool(connection.exec_driver_sql(
+                    "SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar())
+        current_app.extensions['search_fts5'] = available
+    return available
+
+
+def ensure_search_index():
+    """
+    Create the FTS tables and triggers if they are missing, filling newly
+    created tables from the existing rows. Idempotent; run on every start.
+    """
+    if not fts_available():
+        return []
+
+    created = []
+    with db.engine.begin() as connection:
+        existing = {row[0] for row in connection.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for name, (table, columns) in INDEXES.items():
+            for statement in _ddl(name, table, columns):
+                connection.exec_driver_sql(statement)
+            if name not in existing:
+                connection.exec_driver_sql(f"INSERT INTO {name}({name}) VALUES ('rebuild')")
+                created.append(name)
+    return created
+
+
+def reindex():
+    """Rebuild every FTS index from its content table and merge its segments."""
+    if not fts_available():
+        return {}
+
+    ensure_search_index()
+    counts = {}
+    with db.engine.begin() as connection:
+        for name, (table, _) in INDEXES.items():
+            connection.exec_driver_sql(f"INSERT INTO {name}({name}) VALUES ('rebuild')")
+            connection.exec_driver_sql(f"INSERT INTO {name}({name}) VALUES ('optimize')")
+            counts[name] = connection.exec_driver_sql(f'SELECT count(*) FROM {table}').scalar()
+    return counts
+
+
+def search_terms(query):
+    """Split a user's search into at most MAX_TERMS words."""
+    return re.findall(r'\w+', query or '')[:MAX_TERMS]
+
+
+def match_expression(terms):
+    """Build an FTS5 query matching every term, the last one as a prefix."""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def _ranked_ids(name, table, terms, filters, cursor, per_page):
+    """Return ([(rowid, rank)], next_cursor) for one page of a ranked FTS query."""
+    params = {'match': match_expression(terms), 'limit': per_page + 1}
+    join = f'JOIN {table} ON {table}.id = {name}.rowid' if filters else ''
+    conditions = [f'{name} MATCH :match']
+    for index, (column_name, value) in enumerate(filters.items()):
+        conditions.append(f'{table}.{column_name} = :filter_{index}')
+        params[f'filter_{index}'] = value
+
+    after = decode_cursor(cursor, CURSOR_COLUMNS)
+    if after is not None:
+        conditions.append(f'({name}.rank > :after_rank OR '
+                          f'({name}.rank = :after_rank AND {name}.rowid > :after_id))')
+        params['after_rank'], params['after_id'] = after
+
+    rows = db.session.execute(text(
+        f'SELECT {name}.rowid, {name}.rank FROM {name} {join} '
+        f'WHERE {" AND ".join(conditions)} '
+        f'ORDER BY {name}.rank, {name}.rowid LIMIT :limit'), params).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        rowid, rank = rows[-1]
+        next_cursor = encode_cursor([rank, rowid])
+    return rows, next_cursor
+
+
+def _like_page(query, model, columns, terms, cursor, per_page):
+    """Fallback without FTS5: every term must appear in one of the columns."""
+    for term in terms:
+        query = query.filter(or_(*[getattr(model, c).ilike(f'%{term}%') for c in columns]))
+    return keyset_paginate(query, (model.id,), cursor=cursor, per_page=per_page)
+
+
+def _search(model, name, query, terms, filters, cursor, per_page):
+    """Run a ranked search for model and return a KeysetPage of model instances."""
+    for column_name, value in filters.items():
+        query = query.filter(getattr(model, column_name) == value)
+
+    if not terms:
+        return KeysetPage([], None, per_page)
+    table, columns = INDEXES[name]
+    if not fts_available():
+        return _like_page(query, model, columns, terms, cursor, per_page)
+
+    rows, next_cursor = _ranked_ids(name, table, terms, filters, cursor, per_page)
+    ids = [rowid for rowid, _ in rows]
+    by_id = {item.id: item for item in query.filter(model.id.in_(ids)).all()} if ids else {}
+    return KeysetPage([by_id[i] for i in ids if i in by_id], next_cursor, per_page)
+
+
+def search_questions(query, category_id=None, difficulty=None, cursor=None, per_page=20):
+    """Return a KeysetPage of questions matching query, best match first."""
+    filters = {key: value for key, value in (('category_id', category_id), ('difficulty', difficulty))
+               if value}
+    base = Question.query.options(joinedload(Question.category), joinedload(Question.stats))
+    return _search(Question, 'questions_fts', base, search_terms(query), filters, cursor, per_page)
+
+
+def search_resources(query, resource_type=None, cursor=None, per_page=20):
+    """Return a KeysetPage of resources matching query, best match first."""
+    filters = {'resource_type': resource_type} if resource_type else {}
+    return _search(Resource, 'resources_fts', Resource.query, search_terms(query), filters,
+                   cursor, per_page)
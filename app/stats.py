@@ -0,0 +1,101 @@
+"""
+User Statistics Rollups for Placement Preparation Portal
+=========================================================
+This module maintains the UserStats and UserCategoryStats rollup tables.
+Rollups are updated incrementally in the same transaction that saves a
+QuizResult, so dashboards read a handful of rows instead of scanning every
+attempt a student has ever made. rebuild_user_stats() recomputes them from
+scratch for backfills.
+"""
+
+from datetime import datetime
+from sqlalchemy import insert
+from app import db
+from app.models import QuizResult, UserStats, UserCategoryStats
+from app.leaderboard import leaderboards
+
+
+def _apply(stats, percentage, taken_at):
+    """Fold a single attempt into a rollup row."""
+    stats.attempts = (stats.attempts or 0) + 1
+    stats.percentage_sum = (stats.percentage_sum or 0.0) + (percentage or 0.0)
+    if stats.best_percentage is None or (percentage or 0.0) > stats.best_percentage:
+        stats.best_percentage = percentage
+    if stats.last_taken_at is None or taken_at >= stats.last_taken_at:
+        stats.latest_percentage = percentage
+        stats.last_taken_at = taken_at
+
+
+def record_quiz_result(result):
+    """
+    Update the rollups and leaderboards for a freshly added QuizResult.
+    The caller commits, keeping the result and its rollups in one transaction.
+    """
+    taken_at = result.taken_at or datetime.utcnow()
+
+    user_stats = db.session.get(UserStats, result.user_id)
+    if user_stats is None:
+        user_stats = UserStats(user_id=result.user_id)
+        db.session.add(user_stats)
+    _apply(user_stats, result.percentage, taken_at)
+
+    category_stats = db.session.get(UserCategoryStats, (result.user_id, result.category_id))
+    if category_stats is None:
+        category_stats = UserCategoryStats(user_id=result.user_id, category_id=result.category_id)
+        db.session.add(category_stats)
+    _apply(category_stats, result.percentage, taken_at)
+
+    leaderboards.record(result.user_id, result.category_id, result.percentage, taken_at)
+
+    return user_stats, category_stats
+
+
+def best_scores(user_id):
+    """Return {category_id: best_percentage} for a user."""
+    rows = db.session.query(UserCategoryStats.category_id, UserCategoryStats.best_percentage)\
+        .filter(UserCategoryStats.user_id == user_id).all()
+    return dict(rows)
+
+
+def rebuild_user_stats(batch_size=10000):
+    """
+    Recompute every rollup row from the quiz_results table.
+    Results are streamed in (taken_at, id) order so memory stays proportional
+    to the number of users and categories, not the number of attempts.
+    """
+    users = {}
+    categories = {}
+
+    rows = db.session.query(QuizResult.user_id, QuizResult.category_id,
+                            QuizResult.percentage, QuizResult.taken_at)\
+        .order_by(QuizResult.taken_at, QuizResult.id)\
+        .yield_per(batch_size)
+
+    for user_id, category_id, percentage, taken_at in rows:
+        taken_at = taken_at or datetime.min
+        if user_id not in users:
+            users[user_id] = UserStats(user_id=user_id)
+        _apply(users[user_id], percentage, taken_at)
+
+        key = (user_id, category_id)
+        if key not in categories:
+            categories[key] = UserCategoryStats(user_id=user_id, category_id=category_id)
+        _apply(categories[key], percentage, taken_at)
+
+    db.session.query(UserCategoryStats).delete()
+    db.session.query(UserStats).delete()
+
+    columns = ('attempts', 'percentage_sum', 'best_percentage', 'latest_percentage', 'last_taken_at')
+    user_rows = [dict({'user_id': s.user_id}, **{c: getattr(s, c) for c in columns})
+                 for s in users.values()]
+    category_rows = [dict({'user_id': s.user_id, 'category_id': s.category_id},
+                          **{c: getattr(s, c) for c in columns})
+                     for s in categories.values()]
+
+    for start in range(0, len(user_rows), batch_size):
+        db.session.execute(insert(UserStats), user_rows[start:start + batch_size])
+    for start in range(0, len(category_rows), batch_size):
+        db.session.execute(insert(UserCategoryStats), category_rows[start:start + batch_size])
+
+    db.session.commit()
+    return len(user_rows), len(category_rows)
@@ -0,0 +1,310 @@
+"""
+Synthetic Data Generator for Placement Preparation Portal
+==========================================================
+Fills the database with realistic volumes for load tests and benchmarks.
+One unit of scale is 1,000 students, 50 questions per category, 100,000
+quiz results and 500,000 activity events (plus 1,000,000 answers when
+answers are requested), so `--scale 100` gives 100k users, 10M results and
+50M activities.
+
+Everything is drawn from a seeded NumPy generator, so the same seed, scale
+and end date always produce the same rows (only the password hash salt
+differs). Rows are generated in vectorised
+chunks and written with multi-row executemany inserts, one transaction per
+chunk; every user shares one precomputed password hash. Afterwards the
+stats rollups, leaderboards and (with answers) item statistics are rebuilt.
+
+Run it with:
+    flask --app run.py generate-data --scale 10 --seed 42
+"""
+
+import time
+from datetime import date, datetime, timedelta
+import numpy as np
+from sqlalchemy import func
+from werkzeug.security import generate_password_hash
+from app import db
+from app.models import Category, Question, QuizAnswer, QuizResult, Resource, StudentActivity, User
+
+# Rows generated per unit of scale
+PER_SCALE = {
+    'users': 1000,
+    'questions_per_category': 50,
+    'results': 100000,
+    'activities': 500000,
+}
+ANSWERS_PER_RESULT = 10
+HISTORY_DAYS = 365
+
+# Categories created when the database has none
+TOPICS = [
+    ('Quantitative Aptitude', 'aptitude'), ('Logical Reasoning', 'aptitude'),
+    ('Verbal Ability', 'aptitude'), ('Python Programming', 'technical'),
+    ('Java Programming', 'technical'), ('Data Structures', 'technical'),
+    ('SQL & Databases', 'technical'), ('Operating Systems', 'technical'),
+    ('Computer Networks', 'technical'), ('System Design', 'technical'),
+]
+
+FIRST_NAMES = ['Aarav', 'Aditi', 'Arjun', 'Ananya', 'Dev', 'Diya', 'Ishaan', 'Kavya', 'Karan', 'Meera',
+               'Neha', 'Nikhil', 'Priya', 'Rahul', 'Riya', 'Rohan', 'Sanya', 'Siddharth', 'Tanvi', 'Vikram']
+LAST_NAMES = ['Sharma', 'Verma', 'Iyer', 'Nair', 'Reddy', 'Gupta', 'Patel', 'Das', 'Mehta', 'Rao',
+              'Singh', 'Kumar', 'Joshi', 'Menon', 'Bose', 'Kapoor', 'Chopra', 'Pillai', 'Sen', 'Mishra']
+COLLEGES = ['Government Engineering College', 'Institute of Technology', 'National College of Engineering',
+            'City College of Science', 'State University', 'Regional Engineering College']
+WORDS = ('array tree graph queue stack heap hash index query join table process thread memory cache '
+         'network packet router protocol socket class object method function variable loop pointer '
+         'ratio percent profit interest speed distance time average probability series pattern '
+         'sentence synonym antonym grammar passage clause schema transaction lock deadlock kernel '
+         'scheduler page segment latency throughput replica partition shard balance scale').split()
+ACTIVITY_TYPES = [('login', 'Logged in', 0.3), ('quiz', 'Completed a quiz', 0.3),
+                  ('resource_view', 'Viewed placement resources', 0.4)]
+RESOURCE_TYPES = ['interview_tip', 'hr_question', 'coding_link', 'notes']
+LETTERS = np.array(list('ABCD'))
+
+
+def _timestamps(rng, count, start, end, part=0, parts=1):
+    """Return count sorted 'YYYY-MM-DD HH:MM:SS.ffffff' strings in slice part/parts of [start, end)."""
+    span = int((end - start).total_seconds())
+    low, high = span * part // parts, max(span * (part + 1) // parts, span * part // parts + 1)
+    seconds = np.sort(rng.randint(low, high, size=count))
+    stamps = np.datetime64(start, 's') + seconds.astype('timedelta64[s]')
+    return [s.replace('T', ' ') for s in np.datetime_as_string(stamps, unit='us').tolist()]
+
+
+def _insert(connection, table, columns, rows):
+    """Insert row tuples with one executemany; SQLite gets a prepared statement without per-row binding."""
+    if not rows:
+        return
+    if connection.dialect.name == 'sqlite':
+        placeholders = ', '.join('?' * len(columns))
+        connection.exec_driver_sql(
+            f'INSERT INTO {table.name} ({", ".join(columns)}) VALUES ({placeholders})', rows)
+    else:
+        connection.execute(table.insert(), [dict(zip(columns, row)) for row in rows])
+
+
+def _next_id(model):
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def _chunks(total, size):
+    """Yield (index, start, count) for total rows in chunks of size."""
+    parts = max(1, -(-total // size))
+    for index in range(parts):
+        start = total * index // parts
+        yield index, parts, start, total * (index + 1) // parts - start
+
+
+class Generator:
+    """Generates one deterministic data set; call run() inside an app context."""
+
+    def __init__(self, scale=1.0, seed=42, answers=False, end_date=None, batch_size=200000,
+                 password='password', echo=print):
+        self.scale = scale
+        self.rng = np.random.RandomState(seed)
+        self.answers = answers
+        end = end_date or date.today()
+        self.end = datetime(end.year, end.month, end.day)
+        self.start = self.end - timedelta(days=HISTORY_DAYS)
+        self.batch_size = batch_size
+        self.password = password
+        self.echo = echo
+        self.counts = {}
+
+    def _count(self, key):
+        return max(1, int(round(PER_SCALE[key] * self.scale)))
+
+    def _write(self, table, columns, rows):
+        with db.engine.connect() as connection:
+            if connection.dialect.name != 'sqlite':
+                _insert(connection, table, columns, rows)
+                connection.commit()
+                return
+            # Skip fsync for the bulk load only; the connection goes back to the pool afterwards
+            previous = connection.exec_driver_sql('PRAGMA synchronous').scalar()
+            connection.exec_driver_sql('PRAGMA synchronous=OFF')
+            try:
+                _insert(connection, table, columns, rows)
+                connection.commit()
+            finally:
+                connection.rollback()
+                connection.exec_driver_sql(f'PRAGMA synchronous={int(previous)}')
+
+    def _timed(self, label, step):
+        started = time.perf_counter()
+        count = step()
+        self.counts[label] = count
+        self.echo(f'{label}: {count} rows in {time.perf_counter() - started:.1f}s')
+
+    # ---- users ----
+    def users(self):
+        count = self._count('users')
+        first_id = self.user_start = _next_id(User)
+        password_hash = generate_password_hash(self.password)
+        rng = self.rng
+
+        # How often each student shows up, and how well they score
+        self.user_weights = np.cumsum(rng.lognormal(0.0, 1.0, size=count))
+        self.ability = np.clip(rng.normal(0.65, 0.15, size=count), 0.05, 0.98)
+
+        for _, _, start, size in _chunks(count, self.batch_size):
+            ids = np.arange(first_id + start, first_id + start + size)
+            first = rng.randint(len(FIRST_NAMES), size=size)
+            last = rng.randint(len(LAST_NAMES), size=size)
+            college = rng.randint(len(COLLEGES), size=size)
+            created = _timestamps(rng, size, self.start, self.end)
+            rows = [(int(user_id), f'{FIRST_NAMES[f]} {LAST_NAMES[l]}', f'user{user_id}@synthetic.check',
+                     password_hash, 'admin' if user_id == first_id else 'student', COLLEGES[c], stamp, 1)
+                    for user_id, f, l, c, stamp in zip(ids.tolist(), first.tolist(), last.tolist(),
+                                                        college.tolist(), created)]
+            self._write(User.__table__, ('id', 'name', 'email', 'password_hash', 'role', 'college',
+                                         'created_at', 'is_active'), rows)
+        self.admin_email = f'user{first_id}@synthetic.check'
+        return count
+
+    # ---- categories and questions ----
+    def categories(self):
+        existing = Category.query.order_by(Category.id).all()
+        if not existing:
+            db.session.add_all(Category(name=name, type=type_, description=f'Practice {name.lower()}.')
+                               for name, type_ in TOPICS)
+            db.session.commit()
+            existing = Category.query.order_by(Category.id).all()
+        self.category_ids = np.array([category.id for category in existing])
+        self.category_names = [category.name for category in existing]
+        self.category_offset = self.rng.normal(0.0, 0.08, size=len(existing))
+        return len(existing)
+
+    def questions(self):
+        per_category = max(10, self._count('questions_per_category'))
+        first_id = _next_id(Question)
+        rng = self.rng
+        self.question_start = first_id + np.arange(len(self.category_ids)) * per_category
+        self.questions_per_category = per_category
+
+        rows = []
+        question_id = first_id
+        created = _timestamps(rng, per_category * len(self.category_ids), self.start, self.end)
+        for category_id, name in zip(self.category_ids.tolist(), self.category_names):
+            words = rng.randint(len(WORDS), size=(per_category, 12))
+            for n in range(per_category):
+                w = [WORDS[i] for i in words[n]]
+                rows.append((question_id, category_id,
+                             f'{name}: which {w[0]} best describes the {w[1]} of the {w[2]} {w[3]} (#{question_id})?',
+                             f'The {w[4]} {w[5]}', f'The {w[6]} {w[7]}', f'The {w[8]} {w[9]}',
+                             f'The {w[10]} {w[11]}', 'ABCD'[question_id % 4],
+                             f'Compare the {w[1]} with the {w[4]} first.',
+                             ('easy', 'medium', 'hard')[question_id % 3], created[len(rows)]))
+                question_id += 1
+        for _, _, start, size in _chunks(len(rows), self.batch_size):
+            self._write(Question.__table__, ('id', 'category_id', 'question_text', 'option_a', 'option_b',
+                                             'option_c', 'option_d', 'correct_answer', 'explanation',
+                                             'difficulty', 'created_at'), rows[start:start + size])
+        return len(rows)
+
+    def resources(self):
+        count = max(4, int(round(20 * self.scale ** 0.5)))
+        rng = self.rng
+        words = rng.randint(len(WORDS), size=(count, 6))
+        types = rng.randint(len(RESOURCE_TYPES), size=count)
+        created = _timestamps(rng, count, self.start, self.end)
+        rows = [(f'{WORDS[w[0]].title()} and {WORDS[w[1]]} guide',
+                 f'Notes on {WORDS[w[2]]}, {WORDS[w[3]]} and {WORDS[w[4]]}.',
+                 RESOURCE_TYPES[t], f'How the {WORDS[w[5]]} works, with worked examples.',
+                 None, stamp, self.user_start)
+                for w, t, stamp in zip(words.tolist(), types.tolist(), created)]
+        self._write(Resource.__table__, ('title', 'description', 'resource_type', 'content', 'link',
+                                         'created_at', 'created_by'), rows)
+        return count
+
+    def _pick_users(self, size):
+        """Sample user indexes, heavy users more often."""
+        return np.searchsorted(self.user_weights, self.rng.random_sample(size) * self.user_weights[-1])
+
+    # ---- quiz results and answers ----
+    def results(self):
+        total = self._count('results')
+        first_id = self.result_start = _next_id(QuizResult)
+        answer_id = _next_id(QuizAnswer)
+        rng = self.rng
+        answers = 0
+
+        for index, parts, start, size in _chunks(total, self.batch_size):
+            users = self._pick_users(size)
+            categories = rng.randint(len(self.category_ids), size=size)
+            chance = np.clip(self.ability[users] - self.category_offset[categories], 0.02, 0.99)
+            scores = rng.binomial(ANSWERS_PER_RESULT, chance)
+            taken = _timestamps(rng, size, self.start, self.end, index, parts)
+            ids = first_id + start + np.arange(size)
+
+            rows = list(zip(ids.tolist(), (users + self.user_start).tolist(),
+                            self.category_ids[categories].tolist(), scores.tolist(),
+                            [ANSWERS_PER_RESULT] * size, (scores * 100.0 / ANSWERS_PER_RESULT).tolist(), taken))
+            self._write(QuizResult.__table__, ('id', 'user_id', 'category_id', 'score', 'total_questions',
+                                               'percentage', 'taken_at'), rows)
+
+            if self.answers:
+                answer_rows = self._answers(ids, categories, scores, answer_id)
+                self._write(QuizAnswer.__table__, ('id', 'result_id', 'question_id', 'chosen', 'is_correct'),
+                            answer_rows)
+                answer_id += len(answer_rows)
+                answers += len(answer_rows)
+
+        self.counts['quiz_answers'] = answers
+        return total
+
+    def _answers(self, result_ids, categories, scores, first_id):
+        """Answer rows for a chunk of results: consecutive questions of the category, score of them correct."""
+        rng = self.rng
+        size = len(result_ids)
+        offsets = (rng.randint(self.questions_per_category, size=size)[:, None]
+                   + np.arange(ANSWERS_PER_RESULT)) % self.questions_per_category
+        question_ids = self.question_start[categories][:, None] + offsets
+        ranks = rng.random_sample((size, ANSWERS_PER_RESULT)).argsort(axis=1).argsort(axis=1)
+        correct = ranks < scores[:, None]
+        right = question_ids % 4
+        wrong = (right + 1 + rng.randint(3, size=right.shape)) % 4
+        chosen = LETTERS[np.where(correct, right, wrong)]
+
+        count = size * ANSWERS_PER_RESULT
+        return list(zip(range(first_id, first_id + count), np.repeat(result_ids, ANSWERS_PER_RESULT).tolist(),
+                        question_ids.ravel().tolist(), chosen.ravel().tolist(),
+                        correct.ravel().astype(int).tolist()))
+
+    # ---- activity log ----
+    def activities(self):
+        total = self._count('activities')
+        rng = self.rng
+        probabilities = np.array([p for _, _, p in ACTIVITY_TYPES])
+        for index, parts, start, size in _chunks(total, self.batch_size):
+            users = self._pick_users(size) + self.user_start
+            kinds = rng.choice(len(ACTIVITY_TYPES), size=size, p=probabilities)
+            stamps = _timestamps(rng, size, self.start, self.end, index, parts)
+            rows = [(user_id, ACTIVITY_TYPES[kind][0], ACTIVITY_TYPES[kind][1], stamp)
+                    for user_id, kind, stamp in zip(users.tolist(), kinds.tolist(), stamps)]
+            self._write(StudentActivity.__table__, ('user_id', 'activity_type', 'description', 'timestamp'),
+                        rows)
+        return total
+
+    # ---- derived tables ----
+    def rebuild(self):
+        from app.item_stats import rebuild_item_stats
+        from app.leaderboard import rebuild_leaderboards
+        from app.stats import rebuild_user_stats
+
+        self._timed('user_stats', lambda: rebuild_user_stats()[0])
+        self._timed('leaderboard_entries', rebuild_leaderboards)
+        if self.answers:
+            self._timed('question_stats', lambda: rebuild_item_stats()[1])
+
+    def run(self, rebuild=True):
+        """Generate every table, then rebuild the derived ones; returns {table: rows}."""
+        self._timed('users', self.users)
+        self._timed('categories', self.categories)
+        self._timed('questions', self.questions)
+        self._timed('resources', self.resources)
+        self._timed('quiz_results', self.results)
+        self._timed('student_activities', self.activities)
+        if rebuild:
+            self.rebuild()
+        return self.counts
@@ -0,0 +1 @@
+"""Benchmarks for Placement Preparation Portal; run each module with python -m."""
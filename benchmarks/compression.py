@@ -0,0 +1,156 @@
+"""
+Compression Benchmark for Placement Preparation Portal
+=======================================================
+Renders the heaviest pages against a scratch database, then compresses each
+body with every gzip level and brotli quality the middleware can use and
+reports the bytes saved against the CPU time spent per response.
+
+Run it from the project root:
+    python -m benchmarks.compression
+    python -m benchmarks.compression --questions 500 --users 2000 --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from werkzeug.security import generate_password_hash
+
+from config import Config
+from app import create_app, db
+from app.compression import brotli, compress_chunks
+from app.models import Category, Question, Resource, User
+
+# (label, user, url)
+PAGES = [
+    ('admin questions', 'admin', '/admin/questions?per_page=100'),
+    ('admin users', 'admin', '/admin/users'),
+    ('take quiz', 'student', '/quiz/take/1'),
+    ('categories', 'student', '/quiz/'),
+    ('resources', 'student', '/resources'),
+]
+
+SETTINGS = [('gzip', 1), ('gzip', 6), ('gzip', 9)]
+if brotli is not None:
+    SETTINGS += [('br', 1), ('br', 4), ('br', 11)]
+
+
+def seed(questions, users):
+    """Fill the scratch database; one precomputed hash keeps user creation fast."""
+    password_hash = generate_password_hash('password')
+    db.session.add(User(name='Bench Admin', email='admin@bench.check', role='admin',
+                        password_hash=password_hash))
+    db.session.add_all(User(name=f'Student {n}', email=f'student{n}@bench.check', role='student',
+                            password_hash=password_hash) for n in range(users))
+
+    categories = [Category(name=f'Category {n}', type=('aptitude', 'technical')[n % 2],
+                           description=f'Practice set {n}') for n in range(4)]
+    db.session.add_all(categories)
+    db.session.flush()
+    for category in categories:
+        db.session.add_all(Question(
+            category_id=category.id,
+            question_text=f'In {category.name}, which option best completes statement number {n}?',
+            option_a=f'First option {n}', option_b=f'Second option {n}',
+            option_c=f'Third option {n}', option_d=f'Fourth option {n}',
+            correct_answer='ABCD'[n % 4], explanation=f'Worked explanation for question {n}.',
+            difficulty=('easy', 'medium', 'hard')[n % 3]) for n in range(questions))
+    db.session.add(Resource(title='Bench resource', resource_type='notes', content='', created_by=1))
+    db.session.commit()
+
+
+def render_pages(app):
+    """Return [(label, body)] of the uncompressed pages."""
+    clients = {}
+    for role, email in (('student', 'student0@bench.check'), ('admin', 'admin@bench.check')):
+        clients[role] = app.test_client()
+        clients[role].post('/auth/login', data={'email': email, 'password': 'password'})
+        clients[role].get('/')  # consume the login flash message
+
+    pages = []
+    for label, role, url in PAGES:
+        response = clients[role].get(url)
+        if response.status_code != 200:
+            raise SystemExit(f'{url} returned {response.status_code}')
+        pages.append((label, response.get_data()))
+    return pages
+
+
+def measure(body, encoding, level, repeat, chunk_size):
+    """Return (compressed_bytes, median_ms) for compressing body as a chunked stream."""
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = sum(len(part) for part in compress_chunks(chunks, encoding, level))
+        timings.append((time.perf_counter() - start) * 1000)
+    return size, statistics.median(timings)
+
+
+def run(args):
+    fd, path = tempfile.mkstemp(suffix='.db', prefix='bench-compression-')
+    os.close(fd)
+    bench_config = type('BenchConfig', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + path,
+        'WTF_CSRF_ENABLED': False,
+        'ACTIVITY_LOG_SYNC': True,
+        'COMPRESSION_ENABLED': False,
+    })
+    try:
+        app = create_app(bench_config)
+        with app.app_context():
+            seed(args.questions, args.users)
+        pages = render_pages(app)
+        with app.app_context():
+            db.engine.dispose()
+    finally:
+        os.remove(path)
+
+    results = []
+    for label, body in pages:
+        for encoding, level in SETTINGS:
+            size, ms = measure(body, encoding, level, args.repeat, args.chunk_size)
+            results.append({
+                'page': label, 'encoding': encoding, 'level': level,
+                'raw_bytes': len(body), 'compressed_bytes': size,
+                'saved_pct': round(100 * (1 - size / len(body)), 1),
+                'ms': round(ms, 3),
+                'mb_per_s': round(len(body) / 1e6 / (ms / 1000), 1) if ms else None,
+            })
+    return results
+
+
+def print_table(results):
+    print(f'{"page":<16} {"encoding":<9} {"raw KB":>8} {"out KB":>8} {"saved":>7} {"ms":>8} {"MB/s":>8}')
+    for row in results:
+        print(f'{row["page"]:<16} {row["encoding"] + "-" + str(row["level"]):<9} '
+              f'{row["raw_bytes"] / 1024:>8.1f} {row["compressed_bytes"] / 1024:>8.1f} '
+              f'{row["saved_pct"]:>6.1f}% {row["ms"]:>8.3f} {row["mb_per_s"] or 0:>8.1f}')
+    if brotli is None:
+        print('\nbrotli is not installed; only gzip was measured.', file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure bytes saved against CPU time per compression level.')
+    parser.add_argument('--questions', type=int, default=200, help='questions per category (default 200)')
+    parser.add_argument('--users', type=int, default=1000, help='student accounts (default 1000)')
+    parser.add_argument('--repeat', type=int, default=20, help='compressions per measurement (default 20)')
+    parser.add_argument('--chunk-size', type=int, default=8192,
+                        help='bytes per chunk fed to the compressor (default 8192)')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+
+if __name__ == '__main__':
+    main()
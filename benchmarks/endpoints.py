@@ -0,0 +1,325 @@
+"""
+Endpoint Latency Benchmark for Placement Preparation Portal
+============================================================
+Boots the application against a generated data set (see app/synthetic.py),
+then drives the auth, main, quiz and admin routes through the Flask test
+client from several concurrent workers. For every endpoint it reports
+throughput, mean/p50/p95/p99 latency and the number of SQL queries per
+request.
+
+Results can be saved as JSON and compared with an earlier run, so a
+regression between two commits shows up as a p50/p99 or throughput change:
+
+    python -m benchmarks.endpoints --output before.json
+    git checkout my-branch
+    python -m benchmarks.endpoints --compare before.json --fail-on-regression
+
+Generating the data takes a while at larger scales; --database keeps it
+between runs (it is created on the first run and reused afterwards).
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+from sqlalchemy import func
+
+from config import Config
+from app import create_app, db
+from app.instrumentation import count_queries
+from app.models import Question, QuizResult, Resource, User
+from app.synthetic import Generator
+
+# (label, user, method, url, form data, untimed request made first)
+# URLs are formatted with the ids resolved from the data set. The 'visitor'
+# user is a new anonymous client per request, so logging in does not stick.
+ROUTES = [
+    ('auth.login', 'anonymous', 'GET', '/auth/login', None, None),
+    ('auth.login[POST]', 'visitor', 'POST', '/auth/login',
+     {'email': '{student_email}', 'password': '{password}'}, None),
+    ('auth.register', 'anonymous', 'GET', '/auth/register', None, None),
+    ('main.home[anonymous]', 'anonymous', 'GET', '/', None, None),
+    ('main.home', 'student', 'GET', '/', None, None),
+    ('main.dashboard', 'student', 'GET', '/dashboard', None, None),
+    ('main.resources', 'student', 'GET', '/resources', None, None),
+    ('main.search_resources', 'student', 'GET', '/resources/search?q=interview', None, None),
+    ('quiz.list_categories', 'student', 'GET', '/quiz/', None, None),
+    ('quiz.view_category', 'student', 'GET', '/quiz/category/{category_id}', None, None),
+    ('quiz.start_quiz', 'student', 'GET', '/quiz/start/{category_id}', None, None),
+    ('quiz.question', 'student', 'GET', '/quiz/question/1', None, '/quiz/start/{category_id}'),
+    ('quiz.submit_quiz', 'student', 'POST', '/quiz/submit', {'question_1': 'A'}, '/quiz/start/{category_id}'),
+    ('quiz.take_quiz', 'student', 'GET', '/quiz/take/{category_id}', None, None),
+    ('quiz.take_quiz[POST]', 'student', 'POST', '/quiz/take/{category_id}', {'question_1': 'A'}, None),
+    ('quiz.results', 'student', 'GET', '/quiz/results/{result_id}', None, None),
+    ('quiz.history', 'student', 'GET', '/quiz/history', None, None),
+    ('quiz.leaderboard', 'student', 'GET', '/quiz/leaderboard', None, None),
+    ('quiz.leaderboard[category]', 'student', 'GET', '/quiz/leaderboard/{category_id}', None, None),
+    ('admin.dashboard', 'admin', 'GET', '/admin/', None, None),
+    ('admin.cache_stats', 'admin', 'GET', '/admin/cache-stats', None, None),
+    ('admin.analytics', 'admin', 'GET', '/admin/analytics', None, None),
+    ('admin.list_users', 'admin', 'GET', '/admin/users', None, None),
+    ('admin.list_categories', 'admin', 'GET', '/admin/categories', None, None),
+    ('admin.list_questions', 'admin', 'GET', '/admin/questions', None, None),
+    ('admin.list_questions[search]', 'admin', 'GET', '/admin/questions?q=graph', None, None),
+    ('admin.edit_question', 'admin', 'GET', '/admin/questions/{question_id}/edit', None, None),
+    ('admin.duplicate_questions', 'admin', 'GET', '/admin/questions/duplicates', None, None),
+    ('admin.list_resources', 'admin', 'GET', '/admin/resources', None, None),
+    ('admin.edit_resource', 'admin', 'GET', '/admin/resources/{resource_id}/edit', None, None),
+]
+
+# Password hashing is deliberately slow; a few samples are enough
+REQUEST_LIMITS = {'auth.login[POST]': 20}
+
+# GET routes that answer with a redirect when they work
+REDIRECTS = {'quiz.start_quiz'}
+
+
+def prepare_database(path, args):
+    """Generate the data set into path unless it already holds one."""
+    bench_config = _config(path)
+    app = create_app(bench_config)
+    with app.app_context():
+        if User.query.first() is None:
+            started = time.perf_counter()
+            Generator(scale=args.scale, seed=args.seed, answers=args.answers,
+                      echo=lambda line: print(line, file=sys.stderr)).run()
+            print(f'generated data set in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+        db.engine.dispose()
+
+
+def resolve_ids(app, password):
+    """Pick the accounts and rows the routes are formatted with."""
+    with app.app_context():
+        admin = User.query.filter_by(role='admin').order_by(User.id).first()
+        student_id, _ = (db.session.query(QuizResult.user_id, func.count())
+                         .join(User, User.id == QuizResult.user_id)
+                         .filter(User.role == 'student')
+                         .group_by(QuizResult.user_id)
+                         .order_by(func.count().desc()).first())
+        student = db.session.get(User, student_id)
+        result = (QuizResult.query.filter_by(user_id=student_id)
+                  .order_by(QuizResult.taken_at.desc()).first())
+        question = (Question.query.filter_by(category_id=result.category_id)
+                    .order_by(Question.id).first())
+        resource = Resource.query.order_by(Resource.id).first()
+        return {
+            'admin_email': admin.email, 'student_email': student.email, 'password': password,
+            'category_id': result.category_id, 'result_id': result.id,
+            'question_id': question.id, 'resource_id': resource.id if resource else 1,
+        }
+
+
+def _config(path):
+    return type('BenchConfig', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + path,
+        'WTF_CSRF_ENABLED': False,
+        'COMPRESSION_ENABLED': False,
+    })
+
+
+def _format(value, ids):
+    if value is None:
+        return None
+    if isinstance(value, dict):
+        return {key: _format(item, ids) for key, item in value.items()}
+    return value.format(**ids)
+
+
+def login_clients(app, ids):
+    """Return {role: test client} with the student and admin logged in."""
+    clients = {'anonymous': app.test_client()}
+    for role in ('student', 'admin'):
+        client = app.test_client()
+        response = client.post('/auth/login', data={'email': ids[f'{role}_email'],
+                                                    'password': ids['password']})
+        if response.status_code != 302:
+            raise SystemExit(f'could not log in as {ids[f"{role}_email"]}')
+        client.get('/')  # consume the login flash message
+        clients[role] = client
+    return clients
+
+
+def run_endpoint(app, sessions, route, ids, requests, warmup):
+    """Drive one route from every worker; returns its summary row."""
+    label, role, method, url, data, setup = route
+    url, data, setup = _format(url, ids), _format(data, ids), _format(setup, ids)
+    expected = 302 if method == 'POST' or label in REDIRECTS else 200
+    workers = len(sessions)
+    shares = [requests // workers + (1 if n < requests % workers else 0) for n in range(workers)]
+
+    def work(worker):
+        timings, queries, statuses = [], [], Counter()
+        for n in range(warmup + shares[worker]):
+            client = app.test_client() if role == 'visitor' else sessions[worker][role]
+            if setup:
+                client.get(setup)
+            with count_queries() as recorder:
+                started = time.perf_counter()
+                response = client.open(url, method=method, data=data)
+                elapsed = (time.perf_counter() - started) * 1000
+            response.close()
+            if n >= warmup:
+                timings.append(elapsed)
+                queries.append(len(recorder))
+                statuses[response.status_code] += 1
+        return timings, queries, statuses
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        outcomes = list(pool.map(work, range(workers)))
+    wall = time.perf_counter() - started
+
+    timings = np.array([t for outcome in outcomes for t in outcome[0]])
+    queries = np.array([q for outcome in outcomes for q in outcome[1]])
+    statuses = sum((outcome[2] for outcome in outcomes), Counter())
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+    return {
+        'endpoint': label, 'method': method, 'url': url,
+        'requests': int(timings.size),
+        'errors': sum(count for status, count in statuses.items() if status != expected),
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        # Warm-up requests are inside the wall time, so count them too
+        'throughput_rps': round((timings.size + warmup * workers) / wall, 1),
+        'mean_ms': round(float(timings.mean()), 2),
+        'p50_ms': round(float(p50), 2),
+        'p95_ms': round(float(p95), 2),
+        'p99_ms': round(float(p99), 2),
+        'queries_mean': round(float(queries.mean()), 1),
+        'queries_max': int(queries.max()),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    path = args.database
+    scratch = path is None
+    if scratch:
+        fd, path = tempfile.mkstemp(suffix='.db', prefix='bench-endpoints-')
+        os.close(fd)
+    path = os.path.abspath(path)
+    try:
+        prepare_database(path, args)
+        app = create_app(_config(path))
+        ids = resolve_ids(app, args.password)
+        sessions = [login_clients(app, ids) for _ in range(args.workers)]
+
+        endpoints = []
+        for route in ROUTES:
+            if args.only and not any(pattern in route[0] for pattern in args.only):
+                continue
+            requests = min(args.requests, REQUEST_LIMITS.get(route[0], args.requests))
+            row = run_endpoint(app, sessions, route, ids, max(requests, args.workers), args.warmup)
+            endpoints.append(row)
+            print(f'{row["endpoint"]}: p50 {row["p50_ms"]} ms, p99 {row["p99_ms"]} ms', file=sys.stderr)
+
+        # Write the queued activity events before the scratch file goes away
+        app.extensions['activity_log'].shutdown()
+        with app.app_context():
+            db.engine.dispose()
+    finally:
+        if scratch:
+            os.remove(path)
+
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'scale': args.scale, 'seed': args.seed, 'answers': args.answers,
+            'workers': args.workers, 'requests': args.requests, 'warmup': args.warmup,
+        },
+        'endpoints': endpoints,
+    }
+
+
+def print_table(results):
+    print(f'{"endpoint":<32} {"reqs":>5} {"err":>4} {"req/s":>8} {"mean":>8} {"p50":>8} '
+          f'{"p95":>8} {"p99":>8} {"queries":>8}')
+    for row in results['endpoints']:
+        print(f'{row["endpoint"]:<32} {row["requests"]:>5} {row["errors"]:>4} '
+              f'{row["throughput_rps"]:>8.1f} {row["mean_ms"]:>8.2f} {row["p50_ms"]:>8.2f} '
+              f'{row["p95_ms"]:>8.2f} {row["p99_ms"]:>8.2f} {row["queries_mean"]:>8.1f}')
+
+
+def _change(old, new):
+    return 100 * (new - old) / old if old else 0.0
+
+
+def compare(results, baseline, threshold):
+    """Print the change against a saved run; returns the endpoints that regressed."""
+    previous = {row['endpoint']: row for row in baseline['endpoints']}
+    print(f'\ncompared with {baseline["meta"].get("commit") or "baseline"} '
+          f'({baseline["meta"].get("timestamp")})')
+    print(f'{"endpoint":<32} {"p50":>8} {"p99":>8} {"req/s":>8} {"queries":>8}')
+    regressed = []
+    for row in results['endpoints']:
+        old = previous.get(row['endpoint'])
+        if old is None:
+            continue
+        p50 = _change(old['p50_ms'], row['p50_ms'])
+        p99 = _change(old['p99_ms'], row['p99_ms'])
+        rps = _change(old['throughput_rps'], row['throughput_rps'])
+        queries = row['queries_mean'] - old['queries_mean']
+        flag = ''
+        if p50 > threshold or p99 > threshold or rps < -threshold or queries > 0:
+            regressed.append(row['endpoint'])
+            flag = '  REGRESSION'
+        print(f'{row["endpoint"]:<32} {p50:>+7.1f}% {p99:>+7.1f}% {rps:>+7.1f}% {queries:>+8.1f}{flag}')
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure latency, throughput and queries per endpoint.')
+    parser.add_argument('--scale', type=float, default=0.1, help='data set scale (default 0.1)')
+    parser.add_argument('--seed', type=int, default=42, help='random seed for the data set (default 42)')
+    parser.add_argument('--answers', action='store_true', help='also generate per-question answers')
+    parser.add_argument('--database', help='SQLite file to generate into, or reuse if it has data')
+    parser.add_argument('--password', default='password', help='password of the generated accounts')
+    parser.add_argument('--requests', type=int, default=200, help='timed requests per endpoint (default 200)')
+    parser.add_argument('--workers', type=int, default=4, help='concurrent clients (default 4)')
+    parser.add_argument('--warmup', type=int, default=2, help='untimed requests per worker first (default 2)')
+    parser.add_argument('--only', action='append', metavar='TEXT',
+                        help='only endpoints whose label contains TEXT (repeatable)')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--compare', metavar='FILE', help='JSON results of an earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=20.0,
+                        help='percent change counted as a regression (default 20)')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='exit with status 1 if any endpoint regressed')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args(argv)
+
+    results = run(args)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressed = compare(results, json.load(f), args.threshold)
+        if regressed and args.fail_on_regression:
+            raise SystemExit(f'{len(regressed)} endpoint(s) regressed: {", ".join(regressed)}')
+
+
+if __name__ == '__main__':
+    main()
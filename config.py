@@ -7,3 +7,77 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'placement-portal-secret-key-2024'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'app', 'placement.db')
+
+    # Quiz settings
+    QUIZ_QUESTION_COUNT = 10
+    QUIZ_DIFFICULTY_MIX = None  # e.g. {'easy': 3, 'medium': 5, 'hard': 2}
+    QUESTION_INDEX_TTL = int(os.environ.get('QUESTION_INDEX_TTL', 300))  # seconds
+    QUESTION_BANK_VERSION_TTL = int(os.environ.get('QUESTION_BANK_VERSION_TTL', 5))  # seconds
+    # Bucket questions for QUIZ_DIFFICULTY_MIX by their 'authored' label or by the
+    # 'measured' correctness rate from the item statistics
+    QUIZ_DIFFICULTY_SOURCE = os.environ.get('QUIZ_DIFFICULTY_SOURCE', 'authored')
+    ITEM_STATS_MIN_ATTEMPTS = int(os.environ.get('ITEM_STATS_MIN_ATTEMPTS', 20))  # answers before stats are trusted
+    NEAR_DUPLICATE_THRESHOLD = float(os.environ.get('NEAR_DUPLICATE_THRESHOLD', 0.7))  # estimated Jaccard similarity
+    NEAR_DUPLICATE_INDEX_TTL = int(os.environ.get('NEAR_DUPLICATE_INDEX_TTL', 3600))  # seconds
+
+    # Quizzes in progress: 'database' (quiz_attempts table) or 'memory' (per-process LRU)
+    QUIZ_ATTEMPT_STORE = os.environ.get('QUIZ_ATTEMPT_STORE', 'database')
+    QUIZ_ATTEMPT_TTL = int(os.environ.get('QUIZ_ATTEMPT_TTL', 2 * 60 * 60))  # seconds
+    QUIZ_ATTEMPT_PURGE_INTERVAL = 300  # seconds between bulk purges of expired attempts
+    QUIZ_ATTEMPT_MAX_ENTRIES = 10000  # memory backend only
+    QUIZ_PAYLOAD_CACHE_TTL = int(os.environ.get('QUIZ_PAYLOAD_CACHE_TTL', 600))  # seconds
+
+    # Leaderboards
+    LEADERBOARD_SIZE = int(os.environ.get('LEADERBOARD_SIZE', 10))  # entries shown per board
+    LEADERBOARD_CACHE_TTL = int(os.environ.get('LEADERBOARD_CACHE_TTL', 300))  # seconds
+
+    # Pagination settings
+    PER_PAGE = 20
+    MAX_PER_PAGE = 100
+    ADMIN_QUESTIONS_PER_PAGE = int(os.environ.get('ADMIN_QUESTIONS_PER_PAGE', 25))
+    HISTORY_PER_PAGE = int(os.environ.get('HISTORY_PER_PAGE', 20))
+
+    # Cache settings
+    COUNTER_CACHE_TTL = int(os.environ.get('COUNTER_CACHE_TTL', 60))  # seconds
+    IDENTITY_CACHE_TTL = int(os.environ.get('IDENTITY_CACHE_TTL', 300))  # seconds
+    IDENTITY_CACHE_SIZE = int(os.environ.get('IDENTITY_CACHE_SIZE', 10000))  # entries
+    IDENTITY_VERSION_TTL = int(os.environ.get('IDENTITY_VERSION_TTL', 5))  # seconds
+
+    # Whole-page cache for anonymous visitors (home and resources pages)
+    RESPONSE_CACHE_ENABLED = os.environ.get('RESPONSE_CACHE_ENABLED', '1').lower() in ('1', 'true', 'yes')
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 300))  # seconds
+    RESPONSE_CACHE_VERSION_TTL = int(os.environ.get('RESPONSE_CACHE_VERSION_TTL', 5))  # seconds
+
+    # Template fragment cache ({% cache %}): 'memory' (per-process LRU) or 'sqlite' (shared file)
+    FRAGMENT_CACHE_ENABLED = os.environ.get('FRAGMENT_CACHE_ENABLED', '1').lower() in ('1', 'true', 'yes')
+    FRAGMENT_CACHE_BACKEND = os.environ.get('FRAGMENT_CACHE_BACKEND', 'memory')
+    FRAGMENT_CACHE_PATH = os.environ.get('FRAGMENT_CACHE_PATH')  # default: instance/fragments.db
+    FRAGMENT_CACHE_TTL = int(os.environ.get('FRAGMENT_CACHE_TTL', 300))  # seconds
+    FRAGMENT_CACHE_SIZE = int(os.environ.get('FRAGMENT_CACHE_SIZE', 1000))  # entries
+    FRAGMENT_CACHE_GENERATION_TTL = int(os.environ.get('FRAGMENT_CACHE_GENERATION_TTL', 5))  # seconds
+
+    # Static assets: serve the hashed files written by `flask build-assets` when present
+    ASSETS_FINGERPRINT = os.environ.get('ASSETS_FINGERPRINT', '1').lower() in ('1', 'true', 'yes')
+    ASSETS_MAX_AGE = int(os.environ.get('ASSETS_MAX_AGE', 31536000))  # seconds, for hashed files
+
+    # Response compression (brotli needs the optional brotli package)
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', '1').lower() in ('1', 'true', 'yes')
+    COMPRESSION_LEVEL = int(os.environ.get('COMPRESSION_LEVEL', 6))  # gzip, 1-9
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 4))  # 0-11
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 500))  # bytes
+
+    # SQL instrumentation: query counts/timings per request and N+1 warnings
+    SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION', '1').lower() in ('1', 'true', 'yes')
+    SERVER_TIMING_HEADER = os.environ.get('SERVER_TIMING_HEADER', '1').lower() in ('1', 'true', 'yes')
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.environ.get('SQL_N_PLUS_ONE_THRESHOLD', 5))  # same statement per request
+
+    # Activity logging (written behind the request by a background thread)
+    ACTIVITY_LOG_SYNC = os.environ.get('ACTIVITY_LOG_SYNC', '').lower() in ('1', 'true', 'yes')
+    ACTIVITY_BATCH_SIZE = int(os.environ.get('ACTIVITY_BATCH_SIZE', 500))  # events per insert
+    ACTIVITY_FLUSH_INTERVAL = float(os.environ.get('ACTIVITY_FLUSH_INTERVAL', 2.0))  # seconds
+
+    # Admin analytics
+    ANALYTICS_CACHE_TTL = int(os.environ.get('ANALYTICS_CACHE_TTL', 600))  # seconds
+    ANALYTICS_PASS_MARK = float(os.environ.get('ANALYTICS_PASS_MARK', 50))  # percent
+    ANALYTICS_HISTOGRAM_BINS = 10
+    ANALYTICS_TREND_DAYS = 30
@@ -6,7 +6,8 @@ Run this script after initializing the database:
 """
 
 from app import create_app, db
-from app.models import User, Category, Question, Resource
+from app.models import User, Category, Resource
+from app.importer import import_rows
 from datetime import datetime
 
 def create_admin_user():
@@ -303,32 +304,14 @@ def create_questions(categories):
         ]
     }
 
-    total_questions = 0
+    # Existing questions are skipped by the importer's in-memory fingerprint set
+    rows = []
     for category in categories:
-        if category.name in questions_data:
-            for q_data in questions_data[category.name]:
-                existing = Question.query.filter_by(
-                    question_text=q_data['question_text'],
-                    category_id=category.id
-                ).first()
-                if existing:
-                    continue
+        for q_data in questions_data.get(category.name, []):
+            rows.append((len(rows) + 1, dict(q_data, category_id=category.id)))
 
-                question = Question(
-                    category_id=category.id,
-                    question_text=q_data['question_text'],
-                    option_a=q_data['option_a'],
-                    option_b=q_data['option_b'],
-                    option_c=q_data['option_c'],
-                    option_d=q_data['option_d'],
-                    correct_answer=q_data['correct_answer'],
-                    explanation=q_data['explanation'],
-                    difficulty=q_data['difficulty']
-                )
-                db.session.add(question)
-                total_questions += 1
-
-    db.session.commit()
+    report = import_rows(rows)
+    total_questions = report.inserted
     print(f"Created {total_questions} new questions.")
     return total_questions
 